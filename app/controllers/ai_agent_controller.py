@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
+from app.models.database import get_async_db
 from app.services.ai_agent_service import AIAgentService
-from app.models.user import User
+from app.utils.loop_watchdog import loop_watchdog
+from app.utils.principals import Principal
+from app.utils.pool_stats import async_pool_monitor, pool_monitor
 from app.utils.dependencies import get_current_user 
 
 router = APIRouter()
@@ -12,7 +17,7 @@ ai_service = AIAgentService()
 
 @router.get("/recommendations", summary="Get recommended quizzes for the current user")
 async def get_recommendations(
-    current_user: User = Depends(get_current_user), 
+    current_user: Principal = Depends(get_current_user), 
 ):
     try:
         recommendations = await ai_service.get_recommendations(user_id=current_user.id)
@@ -21,18 +26,20 @@ async def get_recommendations(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get(
+    "/recommendations/stats", summary="Get the last recommendation batch run"
+)
+async def get_recommendation_stats():
+    return {"success": True, "data": await ai_service.get_recommendation_stats()}
+
+
 @router.get("/trending", summary="Get top trending technologies")
-async def get_trending_technologies():
+async def get_trending_technologies(db: AsyncSession = Depends(get_async_db)):
     try:
-        from app.models.database import get_db
         from app.models.quiz import QuizTrend
 
-        db = next(get_db())
-        trending = (
-            db.query(QuizTrend)
-            .order_by(QuizTrend.popularity_score.desc())
-            .limit(5)
-            .all()
+        trending = await db.scalars(
+            select(QuizTrend).order_by(QuizTrend.popularity_score.desc()).limit(5)
         )
         return {
             "success": True,
@@ -54,3 +61,57 @@ async def get_leaderboard():
         raise HTTPException(
             status_code=500, detail=f"Error getting leaderboard: {str(e)}"
         )
+
+
+@router.get("/leaderboard/me", summary="Get the current user's leaderboard rank")
+async def get_my_rank(current_user: Principal = Depends(get_current_user)):
+    try:
+        rank = await ai_service.get_user_rank(user_id=current_user.id)
+        return {"success": True, "data": rank}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error getting leaderboard rank: {str(e)}"
+        )
+
+
+@router.get("/inventory", summary="Get pre-generated quiz pool depth and hit rate")
+async def get_inventory_stats():
+    try:
+        stats = await ai_service.get_inventory_stats()
+        return {"success": True, "data": stats}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error getting inventory stats: {str(e)}"
+        )
+
+
+@router.get("/duplicates", summary="Get near-duplicate question rates per technology")
+async def get_duplicate_stats():
+    try:
+        stats = await ai_service.get_duplicate_stats()
+        return {"success": True, "data": stats}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error getting duplicate stats: {str(e)}"
+        )
+
+
+@router.get("/scheduler", summary="Get generation queue depth and job timings")
+async def get_scheduler_stats(request: Request):
+    agent = getattr(request.app.state, "quiz_agent", None)
+    if agent is None:
+        raise HTTPException(status_code=503, detail="AI agent is not running")
+    return {"success": True, "data": agent.scheduler.stats()}
+
+
+@router.get("/db-pool", summary="Get database pool usage and checkout wait times")
+async def get_db_pool_stats(current_user: Principal = Depends(get_current_user)):
+    return {
+        "success": True,
+        "data": {"sync": pool_monitor.stats(), "async": async_pool_monitor.stats()},
+    }
+
+
+@router.get("/loop-lag", summary="Get event-loop lag histogram and recent stalls")
+async def get_loop_lag_stats(current_user: Principal = Depends(get_current_user)):
+    return {"success": True, "data": loop_watchdog.stats()}
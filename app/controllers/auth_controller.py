@@ -8,15 +8,16 @@ from app.schemas.user import UserCreate, UserInDB
 from app.services.auth_service import AuthService
 from app.services.user_service import UserService
 from app.utils.dependencies import get_current_user
+from app.utils.principals import Principal
 
 router = APIRouter()
 auth_service = AuthService()
 user_service = UserService()
 
 @router.post("/register", response_model=UserInDB, status_code=status.HTTP_201_CREATED)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: Session = Depends(get_db)):
     try:
-        return user_service.create_user(db=db, user=user)
+        return await user_service.create_user(db=db, user=user)
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -26,12 +27,32 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         )
 
 @router.post("/token", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
-    return auth_service.login_user(db, form_data.username, form_data.password)
+    return await auth_service.login_user(db, form_data.username, form_data.password)
 
 @router.get("/me", response_model=UserInDB)
-def read_users_me(current_user: UserInDB = Depends(get_current_user)):
-    return current_user
+def read_users_me(
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    user = user_service.get_user_by_id(db, current_user.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
+
+@router.post("/deactivate", response_model=UserInDB)
+def deactivate_account(
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Deactivate the caller's account. This worker refuses the account's
+    tokens at once; other workers within PRINCIPAL_CLAIMS_TTL_SECONDS.
+    """
+    return user_service.set_active(db, current_user.id, is_active=False)
@@ -1,24 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import json
+from contextlib import aclosing
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.schemas.common import PaginatedResponse
-from app.schemas.quiz import QuizAttemptCreate, QuizAttemptOut, QuizCreate, QuizOut
-from app.models.database import get_db
+from app.schemas.quiz import (
+    GenerationJobOut,
+    QuizAttemptCreate,
+    QuizAttemptOut,
+    QuizCreate,
+    QuizOut,
+    QuizSummaryOut,
+)
+from app.controllers.ai_agent_controller import ai_service
+from app.models.database import get_async_db, get_db
+from app.services.generation_jobs import FINISHED, GenerationJobService
 from app.services.quiz_service import QuizService
 from app.utils.dependencies import get_current_user
-from app.models.user import User
+from app.utils.principals import Principal
 
 router = APIRouter()
 quiz_service = QuizService()
+generation_jobs = GenerationJobService(quiz_service)
+
+# Seconds between SSE keep-alive comments while a job makes no progress
+JOB_EVENTS_KEEPALIVE_SECONDS = 15
 
 
 @router.post("/create", response_model=QuizOut)
 async def create_quiz(
     quiz_data: QuizCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    return quiz_service.create_quiz_from_schema(db, quiz_data, user_id=current_user.id)
+    return await quiz_service.create_quiz_from_schema(
+        db, quiz_data, user_id=current_user.id
+    )
 
 
 @router.post("/generate", response_model=QuizOut)
@@ -26,8 +53,8 @@ async def generate_quiz(
     technology: str,
     difficulty: str,
     num_questions: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
 ):
     quiz = await quiz_service.generate_quiz_with_groq(
         db, technology, difficulty, num_questions, user_id=current_user.id
@@ -39,40 +66,177 @@ async def generate_quiz(
     return quiz
 
 
+@router.post("/generate/stream")
+async def generate_quiz_stream(
+    technology: str,
+    difficulty: str,
+    num_questions: int,
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+    current_user: Principal = Depends(get_current_user),
+):
+    events = quiz_service.stream_quiz_generation(
+        technology, difficulty, num_questions, user_id=current_user.id
+    )
+
+    async def body():
+        # Close the generator as soon as the response stops, so its cleanup
+        # runs on a disconnect rather than whenever it is garbage collected
+        async with aclosing(events):
+            async for event in events:
+                if format == "sse":
+                    yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+                else:
+                    yield json.dumps(event) + "\n"
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream" if format == "sse" else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/jobs", response_model=GenerationJobOut, status_code=202)
+async def submit_generation_job(
+    technology: str,
+    difficulty: str,
+    num_questions: int,
+    current_user: Principal = Depends(get_current_user),
+):
+    job = generation_jobs.submit(
+        technology, difficulty, num_questions, user_id=current_user.id
+    )
+    return JSONResponse(
+        status_code=202,
+        content=job.to_dict(),
+        headers={"Location": f"/api/v1/quiz/jobs/{job.id}"},
+    )
+
+
+def _get_job(job_id: str, current_user: Principal):
+    job = generation_jobs.get(job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=GenerationJobOut)
+async def get_generation_job(
+    job_id: str, current_user: Principal = Depends(get_current_user)
+):
+    return _get_job(job_id, current_user).to_dict()
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_generation_job(
+    job_id: str, current_user: Principal = Depends(get_current_user)
+):
+    job = _get_job(job_id, current_user)
+
+    async def events():
+        while True:
+            changed = job.changed
+            yield f"event: {job.status}\ndata: {json.dumps(job.to_dict())}\n\n"
+            if job.status in FINISHED:
+                return
+            while not await generation_jobs.wait_for_change(
+                changed, JOB_EVENTS_KEEPALIVE_SECONDS
+            ):
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/public", response_model=PaginatedResponse[QuizOut])
 def get_public_quizzes(
     page: int = Query(1, ge=1),
     limit: int = Query(10, le=100),
+    cursor: Optional[str] = None,
+    with_total: bool = True,
+    db: Session = Depends(get_db),
+    # current_user: Principal = Depends(get_current_user),  # Uncomment after testing
+):
+    return quiz_service.get_public_quizzes(
+        db, page=page, limit=limit, cursor=cursor, with_total=with_total
+    )
+
+
+@router.get("/public/summary", response_model=PaginatedResponse[QuizSummaryOut])
+def get_public_quiz_summaries(
+    page: int = Query(1, ge=1),
+    limit: int = Query(10, le=100),
+    cursor: Optional[str] = None,
+    with_total: bool = True,
     db: Session = Depends(get_db),
-    # current_user: User = Depends(get_current_user),  # Uncomment after testing
 ):
-    return quiz_service.get_public_quizzes(db, page=page, limit=limit)
+    return quiz_service.get_public_quizzes(
+        db, page=page, limit=limit, cursor=cursor, with_total=with_total, summary=True
+    )
 
 
 @router.get("/user", response_model=PaginatedResponse[QuizOut])
 def get_user_quizzes(
     page: int = Query(1, ge=1),
     limit: int = Query(10, le=100),
+    cursor: Optional[str] = None,
+    with_total: bool = True,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     return quiz_service.get_user_quizzes(
-        db, user_id=current_user.id, page=page, limit=limit
+        db,
+        user_id=current_user.id,
+        page=page,
+        limit=limit,
+        cursor=cursor,
+        with_total=with_total,
+    )
+
+
+@router.get("/user/summary", response_model=PaginatedResponse[QuizSummaryOut])
+def get_user_quiz_summaries(
+    page: int = Query(1, ge=1),
+    limit: int = Query(10, le=100),
+    cursor: Optional[str] = None,
+    with_total: bool = True,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    return quiz_service.get_user_quizzes(
+        db,
+        user_id=current_user.id,
+        page=page,
+        limit=limit,
+        cursor=cursor,
+        with_total=with_total,
+        summary=True,
     )
 
 
 @router.post("/submit", response_model=QuizAttemptOut)
 def submit_quiz_attempt(
     attempt_data: QuizAttemptCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
-    return quiz_service.create_quiz_attempt(db, attempt_data, user_id=current_user.id)
+    attempt = quiz_service.create_quiz_attempt(
+        db, attempt_data, user_id=current_user.id
+    )
+    # The attempt is committed; record it as activity for recommendations,
+    # trends and the generation scheduler's demand after responding
+    background_tasks.add_task(
+        ai_service.analyze_user_behavior, current_user.id, attempt.quiz_id
+    )
+    return attempt
 
 
 @router.get("/users/attempt", response_model=List[QuizAttemptOut])
 def get_user_attempts(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)
 ):
     return quiz_service.get_user_attempts(db, user_id=current_user.id)
 
@@ -80,6 +244,18 @@ def get_user_attempts(
 @router.get("/{quiz_id}", response_model=QuizOut)
 def get_quiz_by_id(
     quiz_id: int,
+    request: Request,
     db: Session = Depends(get_db),
 ):
-    return quiz_service.get_quiz_by_id(db, quiz_id)
+    cached = quiz_service.get_quiz_payload(db, quiz_id)
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in tags or cached.etag in tags:
+            return Response(status_code=304, headers=headers)
+
+    return Response(
+        content=cached.body, media_type="application/json", headers=headers
+    )
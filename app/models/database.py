@@ -1,21 +1,88 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from config import settings
+from app.utils.pool_stats import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    async_pool_monitor,
+    pool_monitor,
+)
 import logging
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+
+def _engine_options(url: str, poolclass=InstrumentedQueuePool) -> dict:
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (
+        None,
+        "",
+        ":memory:",
+    ):
+        # In-memory SQLite needs its single shared connection, not a sized pool
+        return options
+    options.update(
+        poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    return options
+
+
+def async_database_url(url: str) -> str:
+    """
+    The asyncio-driver form of a sync database URL: asyncpg for Postgres,
+    aiosqlite for SQLite. Other URLs are returned unchanged.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "postgresql":
+        query = dict(parsed.query)
+        if "sslmode" in query:
+            # asyncpg spells libpq's sslmode as ssl
+            query["ssl"] = query.pop("sslmode")
+        parsed = parsed.set(drivername="postgresql+asyncpg", query=query)
+    elif backend == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+
 try:
-    engine = create_engine(settings.DATABASE_URL, echo=False, future=True)
+    engine = create_engine(
+        settings.DATABASE_URL,
+        echo=False,
+        future=True,
+        **_engine_options(settings.DATABASE_URL),
+    )
+    pool_monitor.attach(engine.pool)
+    async_url = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(
+        async_url,
+        echo=False,
+        **_engine_options(async_url, poolclass=InstrumentedAsyncQueuePool),
+    )
+    async_pool_monitor.attach(async_engine.sync_engine.pool)
     logger.info("Database connection established.")
 except Exception as e:
     logger.error(f"Database connection failed: {e}")
     raise
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay usable after commit: reloading an expired attribute would be
+# implicit IO, which AsyncSession does not allow
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
 
 Base = declarative_base()
 
@@ -25,3 +92,8 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -7,6 +7,7 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Float,
+    Index,
 )
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -32,6 +33,14 @@ class Quiz(Base):
     )
     attempts = relationship("QuizAttempt", back_populates="quiz")
 
+    __table_args__ = (
+        # Keyset pagination of the public and per-user listings
+        Index("ix_quizzes_public_created", "is_public", "created_at", "id"),
+        Index("ix_quizzes_creator_created", "created_by", "created_at", "id"),
+        # Recommendation windows: public quizzes of a technology by id
+        Index("ix_quizzes_public_technology", "is_public", "technology", "id"),
+    )
+
 
 class Question(Base):
     __tablename__ = "questions"
@@ -77,6 +86,9 @@ class QuizAttempt(Base):
         "UserAnswer", back_populates="attempt", cascade="all, delete-orphan"
     )
 
+    # "Has this user attempted this quiz" lookups when recommending
+    __table_args__ = (Index("ix_quiz_attempts_user_quiz", "user_id", "quiz_id"),)
+
 
 class UserAnswer(Base):
     __tablename__ = "user_answers"
@@ -112,3 +124,49 @@ class UserActivity(Base):
     last_interaction = Column(DateTime, server_default=func.now())
 
     user = relationship("User", back_populates="activities")
+
+
+class UserScore(Base):
+    """Per-user rollup of quiz_attempts.score, maintained on every submission."""
+
+    __tablename__ = "user_scores"
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    total_score = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class QuizInventory(Base):
+    """Pre-generated, validated quiz waiting to be handed out by /quiz/generate."""
+
+    __tablename__ = "quiz_inventory"
+
+    id = Column(Integer, primary_key=True, index=True)
+    technology = Column(String(100), nullable=False)
+    difficulty = Column(String(50), nullable=False)
+    num_questions = Column(Integer, nullable=False)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_quiz_inventory_bucket", "technology", "difficulty", "num_questions"),
+    )
+
+
+class UserRecommendation(Base):
+    """
+    A user's precomputed recommendation candidates, rebuilt by the
+    recommendation batch job. ``payload`` is a JSON list of
+    ``[quiz_id, title, technology, difficulty]``.
+    """
+
+    __tablename__ = "user_recommendations"
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    payload = Column(Text, nullable=False)
+    computed_at = Column(DateTime, server_default=func.now())
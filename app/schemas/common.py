@@ -1,10 +1,11 @@
 from pydantic import BaseModel
-from typing import List, Generic, TypeVar
+from typing import List, Generic, Optional, TypeVar
 
 T = TypeVar("T")
 
 class PaginatedResponse(BaseModel, Generic[T]):
     page: int
     limit: int
-    total_results: int
+    total_results: Optional[int] = None
+    next_cursor: Optional[str] = None
     results: List[T]
@@ -62,6 +62,19 @@ class QuizOut(BaseModel):
         from_attributes = True
 
 
+class QuizSummaryOut(BaseModel):
+    id: int
+    title: str
+    technology: str
+    difficulty: str
+    num_questions: int
+    created_at: datetime
+    is_ai_generated: Optional[bool] = False
+
+    class Config:
+        from_attributes = True
+
+
 class AnswerSubmission(BaseModel):
     question_id: int
     selected_option_id: int
@@ -69,8 +82,10 @@ class AnswerSubmission(BaseModel):
 
 class QuizAttemptCreate(BaseModel):
     quiz_id: int
-    score: int
-    total_questions: int
+    # Ignored: score and total are computed on the server. Kept optional so
+    # older clients that still send them are accepted.
+    score: Optional[int] = None
+    total_questions: Optional[int] = None
     answers: List[AnswerSubmission]
 
 
@@ -86,6 +101,17 @@ class QuizAttemptOut(BaseModel):
         from_attributes = True
 
 
+class GenerationJobOut(BaseModel):
+    id: str
+    status: str
+    technology: str
+    difficulty: str
+    num_questions: int
+    questions_generated: int
+    quiz_id: Optional[int] = None
+    error: Optional[str] = None
+
+
 class QuizTrendOut(BaseModel):
     id: int
     technology: str
@@ -1,16 +1,38 @@
 import asyncio
+import json
 import random
 import logging
+from collections import defaultdict
 from datetime import datetime, timezone
-from typing import List, Dict
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func, desc
+from typing import List, Dict, Optional
+from sqlalchemy import Integer, select, func, desc, literal_column, union_all
 from sqlalchemy.exc import SQLAlchemyError
-
-from app.models.quiz import Option, Question, Quiz, QuizTrend, UserActivity, QuizAttempt
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.quiz import (
+    Option,
+    Question,
+    Quiz,
+    QuizAttempt,
+    QuizTrend,
+    UserActivity,
+    UserRecommendation,
+)
 from app.models.user import User
-from app.models.database import get_db
+from app.models.database import AsyncSessionLocal
+from app.services.generation_scheduler import (
+    GenerationScheduler,
+    background_rate_limiter,
+)
+from app.services.inventory_service import QuizInventoryService
+from app.services.leaderboard_service import LeaderboardService
+from app.services.quiz_writer import QuizWriter
+from app.services.recommendation_engine import (
+    recommendation_engine,
+    rebuild_recommendations,
+)
 from app.utils.groq_client import GroqClient
+from app.utils.question_index import question_index
 from config import settings
 
 logger = logging.getLogger(__name__)
@@ -18,6 +40,11 @@ logger = logging.getLogger(__name__)
 MAX_RETRIES = 3
 INITIAL_BACKOFF_SECONDS = 2
 
+RECOMMENDATION_LIMIT = 15
+# Candidates read per technology; the recommendations are a random sample
+RECOMMENDATION_WINDOW = 2 * RECOMMENDATION_LIMIT
+RECOMMENDATION_COLUMNS = (Quiz.id, Quiz.title, Quiz.technology, Quiz.difficulty)
+
 
 async def async_sleep(seconds: float):
     await asyncio.sleep(seconds)
@@ -25,41 +52,83 @@ async def async_sleep(seconds: float):
 
 class AIAgentService:
     def __init__(self):
-        self.groq_client = GroqClient()
+        self.groq_client = GroqClient(rate_limiter=background_rate_limiter)
+        self.quiz_writer = QuizWriter()
+        self.leaderboard_service = LeaderboardService()
+        self.inventory = QuizInventoryService()
         self.technologies = settings.TOP_TECHNOLOGIES
-        self.delay_minutes = 30
+        self.scheduler = GenerationScheduler(self.generate_trending_quiz)
         self._running = False
         self.last_activity = "Not started yet"
         # print(f"Agent initialized with technologies: {self.technologies}")
 
     async def run_scheduled_generation(self):
         self._running = True
-        logger.info(
-            f"Starting generation loop (interval: {self.delay_minutes} mins)"
-        )
+        await self.scheduler.run()
 
-        while self._running:
+    async def run_inventory_refill(self):
+        """Top up the emptiest inventory bucket every refill interval."""
+        self._running = True
+        while self._running and settings.INVENTORY_ENABLED:
             try:
-                start_time = datetime.now(timezone.utc)
-                logger.info("Starting quiz generation")
-                await self.generate_trending_quiz()
-                self.last_activity = datetime.now(timezone.utc)
-                duration = (self.last_activity - start_time).total_seconds()
-                logger.info(f"Generated quiz in {duration:.2f}s")
+                await self.refill_inventory()
             except Exception as e:
-                logger.error(f"Generation failed: {e}")
-            finally:
-                logger.info(f"⏳ Next run in {self.delay_minutes} minutes")
-                await asyncio.sleep(self.delay_minutes * 60)
+                logger.error(f"Inventory refill failed: {e}")
+            await asyncio.sleep(settings.INVENTORY_REFILL_INTERVAL_SECONDS)
+
+    async def run_recommendation_refresh(self):
+        """Rebuild the precomputed recommendations every refresh interval."""
+        self._running = True
+        while self._running and settings.RECOMMENDATIONS_PRECOMPUTE_ENABLED:
+            try:
+                await asyncio.to_thread(rebuild_recommendations)
+            except Exception as e:
+                logger.error(f"Recommendation rebuild failed: {e}")
+            await asyncio.sleep(settings.RECOMMENDATION_REFRESH_SECONDS)
+
+    async def refill_inventory(self) -> bool:
+        # Separate short sessions: no connection is held during generation
+        async with AsyncSessionLocal() as db:
+            shortfall = await db.run_sync(self.inventory.shortfall)
+        if not shortfall:
+            return False
+
+        technology, difficulty, missing = shortfall[0]
+        logger.info(
+            f"Refilling inventory: {technology} ({difficulty}), {missing} missing"
+        )
+        quiz_data = await self.groq_client.generate_quiz(
+            technology=technology,
+            difficulty=difficulty,
+            num_questions=settings.INVENTORY_QUESTIONS,
+        )
+        if not quiz_data:
+            return False
+        async with AsyncSessionLocal() as db:
+            await db.run_sync(self.inventory.add, technology, difficulty, quiz_data)
+        return True
+
+    async def get_inventory_stats(self) -> Dict:
+        async with AsyncSessionLocal() as db:
+            return await db.run_sync(self.inventory.stats)
+
+    async def get_recommendation_stats(self) -> Optional[Dict]:
+        return recommendation_engine.last_build
+
+    async def get_duplicate_stats(self) -> Dict:
+        return question_index.stats()
 
     async def stop(self):
         self._running = False
+        await self.scheduler.stop()
 
-    async def generate_trending_quiz(self):
-        db = next(get_db())
+    async def generate_trending_quiz(
+        self, technology: Optional[str] = None, difficulty: Optional[str] = None
+    ) -> Optional[int]:
+        db = AsyncSessionLocal()
         try:
-            technology = random.choice(self.technologies)
-            difficulty = random.choice(["easy", "medium", "hard"])
+            technology = technology or random.choice(self.technologies)
+            difficulty = difficulty or random.choice(["easy", "medium", "hard"])
             num_questions = random.randint(15, 25)
 
             logger.info(f"Attempting to generate quiz: {technology} ({difficulty})")
@@ -86,7 +155,8 @@ class AIAgentService:
                 logger.error("All retries failed. Could not generate quiz.")
                 return
 
-            quiz = Quiz(
+            quiz_id = await db.run_sync(
+                self.quiz_writer.write,
                 title=quiz_data["title"],
                 description=quiz_data.get("description", ""),
                 technology=technology,
@@ -96,48 +166,27 @@ class AIAgentService:
                 is_public=True,
                 is_ai_generated=True,
                 created_at=datetime.now(timezone.utc),
+                questions=quiz_data["questions"],
             )
-
-            db.add(quiz)
-            db.commit()
-            db.refresh(quiz)
-
-            for q in quiz_data["questions"]:
-                question = Question(
-                    quiz_id=quiz.id,
-                    question_text=q["question_text"],
-                    explanation=q.get("explanation", ""),
-                    created_at=datetime.now(timezone.utc),
-                )
-                db.add(question)
-                db.commit()
-                db.refresh(question)
-
-                for o in q["options"]:
-                    option = Option(
-                        question_id=question.id,
-                        option_text=o["option_text"],
-                        is_correct=o["is_correct"],
-                    )
-                    db.add(option)
-
-            db.commit()
-            logger.info(f"Successfully created quiz ID: {quiz.id}")
-            self.update_trends(db, technology)
+            logger.info(f"Successfully created quiz ID: {quiz_id}")
+            self.last_activity = datetime.now(timezone.utc)
+            # No update_trends here: trends are the scheduler's demand signal
+            # and must only count what users do, not what it generated
+            return quiz_id
 
         except SQLAlchemyError as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"DB error during quiz creation: {e}")
         except Exception as e:
             logger.error(f"Unexpected error during quiz generation: {e}")
         finally:
-            db.close()
+            await db.close()
 
 
-    def update_trends(self, db: Session, technology: str):
+    async def update_trends(self, db: AsyncSession, technology: str):
         try:
-            trend = (
-                db.query(QuizTrend).filter(QuizTrend.technology == technology).first()
+            trend = await db.scalar(
+                select(QuizTrend).where(QuizTrend.technology == technology).limit(1)
             )
             if trend:
                 trend.popularity_score = trend.popularity_score + 1.0
@@ -147,25 +196,27 @@ class AIAgentService:
                     technology=technology, popularity_score=1.0, last_updated=func.now()
                 )
                 db.add(trend)
-            db.commit()
+            await db.commit()
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error updating trends: {e}")
 
     async def analyze_user_behavior(self, user_id: int, quiz_id: int):
-        db = next(get_db())
+        db = AsyncSessionLocal()
         try:
-            quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
-            if not quiz:
+            technology = await db.scalar(
+                select(Quiz.technology).where(Quiz.id == quiz_id)
+            )
+            if technology is None:
                 return
 
-            activity = (
-                db.query(UserActivity)
-                .filter(
+            activity = await db.scalar(
+                select(UserActivity)
+                .where(
                     UserActivity.user_id == user_id,
-                    UserActivity.technology == quiz.technology,
+                    UserActivity.technology == technology,
                 )
-                .first()
+                .limit(1)
             )
 
             if activity:
@@ -173,100 +224,148 @@ class AIAgentService:
                 activity.last_interaction = func.now()
             else:
                 activity = UserActivity(
-                    user_id=user_id, technology=quiz.technology, interaction_score=1.0
+                    user_id=user_id, technology=technology, interaction_score=1.0
                 )
                 db.add(activity)
 
-            db.commit()
-            self.update_trends(db, quiz.technology)
+            await db.commit()
+            await self.update_trends(db, technology)
 
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"Error analyzing user behavior: {e}")
         finally:
-            db.close()
+            await db.close()
 
     async def get_recommendations(self, user_id: int) -> List[Dict]:
-        db = next(get_db())
+        db = AsyncSessionLocal()
         try:
-            user_techs = (
-                db.query(UserActivity.technology)
-                .filter(UserActivity.user_id == user_id)
-                .order_by(UserActivity.interaction_score.desc())
-                .limit(3)
-                .all()
+            # With the batch job off, stored entries are never refreshed
+            payload = None
+            if settings.RECOMMENDATIONS_PRECOMPUTE_ENABLED:
+                payload = await db.scalar(
+                    select(UserRecommendation.payload).where(
+                        UserRecommendation.user_id == user_id
+                    )
+                )
+            if payload:
+                # Drop quizzes attempted since the last rebuild
+                attempted = set(
+                    await db.scalars(
+                        select(QuizAttempt.quiz_id).where(
+                            QuizAttempt.user_id == user_id
+                        )
+                    )
+                )
+                stored = [
+                    entry for entry in json.loads(payload) if entry[0] not in attempted
+                ]
+                if stored:
+                    return [
+                        dict(zip(("id", "title", "technology", "difficulty"), entry))
+                        for entry in random.sample(
+                            stored, min(RECOMMENDATION_LIMIT, len(stored))
+                        )
+                    ]
+
+            # Not precomputed yet (new user), or everything stored was
+            # attempted since: recommend live
+            tech_list = list(
+                await db.scalars(
+                    select(UserActivity.technology)
+                    .where(UserActivity.user_id == user_id)
+                    .order_by(UserActivity.interaction_score.desc())
+                    .limit(3)
+                )
             )
 
-            tech_list = [tech[0] for tech in user_techs] if user_techs else []
-
             if not tech_list:
-                trend_techs = (
-                    db.query(QuizTrend.technology)
-                    .order_by(QuizTrend.popularity_score.desc())
-                    .limit(3)
-                    .all()
+                tech_list = list(
+                    await db.scalars(
+                        select(QuizTrend.technology)
+                        .order_by(QuizTrend.popularity_score.desc())
+                        .limit(3)
+                    )
                 )
-                tech_list = [tech[0] for tech in trend_techs]
-
-            quizzes_query = db.query(Quiz).filter(Quiz.is_public == True)
-
-            if tech_list:
-                quizzes_query = quizzes_query.filter(Quiz.technology.in_(tech_list))
-
-            quizzes = quizzes_query.order_by(Quiz.created_at.desc()).all()
-
-            # Deduplicate and shuffle to avoid showing same technology repeatedly
-            seen_ids = set()
-            unique_quizzes = []
-            for quiz in quizzes:
-                if quiz.id not in seen_ids:
-                    seen_ids.add(quiz.id)
-                    unique_quizzes.append(quiz)
-
-            random.shuffle(unique_quizzes)
-            selected = unique_quizzes[:15]
 
+            # Start at a random id and read a short window of candidates per
+            # technology from the index, so the cost does not depend on how
+            # many quizzes there are. Each technology's window wraps around on
+            # its own when it runs off the end, so a technology whose quizzes
+            # are all below the pivot still gets its share.
+            max_id = await db.scalar(select(func.max(Quiz.id)))
+            if max_id is None:
+                return []
+            pivot = random.randint(1, max_id)
+            candidates = self._recommendation_candidates(
+                user_id, tech_list or [None], pivot
+            )
+            windows = defaultdict(list)
+            rows = (await db.execute(candidates)).all()
+            # Each technology's forward window first, then its wrapped one
+            for row in sorted(rows, key=lambda row: (row.part, row.id)):
+                window = windows[row.part // 2]
+                if len(window) < RECOMMENDATION_WINDOW:
+                    window.append(row)
+            rows = [row for window in windows.values() for row in window]
+
+            selected = random.sample(rows, min(RECOMMENDATION_LIMIT, len(rows)))
             return [
                 {
-                    "id": quiz.id,
-                    "title": quiz.title,
-                    "technology": quiz.technology,
-                    "difficulty": quiz.difficulty,
+                    "id": row.id,
+                    "title": row.title,
+                    "technology": row.technology,
+                    "difficulty": row.difficulty,
                 }
-                for quiz in selected
+                for row in selected
             ]
 
         except Exception as e:
             logger.error(f"Error generating recommendations: {e}")
             return []
         finally:
-            db.close()
+            await db.close()
+
+    def _recommendation_candidates(
+        self, user_id: int, technologies: List[Optional[str]], pivot: int
+    ):
+        """
+        Public quizzes the user has not attempted, as two windows of up to
+        RECOMMENDATION_WINDOW per technology: from ``pivot`` upwards, and from
+        the start below ``pivot``. ``part`` is ``2 * position`` of the
+        technology, plus one for the wrapped window.
+        """
+        attempted = (
+            select(QuizAttempt.id)
+            .where(QuizAttempt.user_id == user_id, QuizAttempt.quiz_id == Quiz.id)
+            .exists()
+        )
+        windows = []
+        for position, technology in enumerate(technologies):
+            for wrapped in (False, True):
+                part = literal_column(str(2 * position + wrapped), Integer)
+                query = select(*RECOMMENDATION_COLUMNS, part.label("part")).where(
+                    Quiz.is_public == True,
+                    Quiz.id < pivot if wrapped else Quiz.id >= pivot,
+                    ~attempted,
+                )
+                if technology is not None:
+                    query = query.where(Quiz.technology == technology)
+                windows.append(
+                    query.order_by(Quiz.id).limit(RECOMMENDATION_WINDOW).subquery()
+                )
+        return union_all(*[select(window) for window in windows])
 
     async def get_leaderboard(self, limit: int = 50) -> List[Dict]:
-        db = next(get_db())
+        db = AsyncSessionLocal()
         try:
-            results = (
-                db.query(
-                    User.username,
-                    func.coalesce(func.sum(QuizAttempt.score), 0).label("total_score"),
-                )
-                .join(User, QuizAttempt.user_id == User.id)
-                .group_by(User.id, User.username)
-                .order_by(desc("total_score"))
-                .limit(limit)
-                .all()
-            )
-
-            return [
-                {
-                    "username": row.username,
-                    "total_score": int(row.total_score),
-                    "rank": idx + 1,
-                }
-                for idx, row in enumerate(results)
-            ]
+            return await db.run_sync(self.leaderboard_service.get_leaderboard, limit)
         except Exception as e:
             logger.error(f"Error getting leaderboard: {e}")
             return []
         finally:
-            db.close()
+            await db.close()
+
+    async def get_user_rank(self, user_id: int) -> Dict:
+        async with AsyncSessionLocal() as db:
+            return await db.run_sync(self.leaderboard_service.get_user_rank, user_id)
@@ -10,8 +10,8 @@ from app.services.user_service import UserService
 user_service = UserService()
 
 class AuthService:
-    def login_user(self, db: Session, username: str, password: str) -> Token:
-        user = user_service.authenticate_user(db, username, password)
+    async def login_user(self, db: Session, username: str, password: str) -> Token:
+        user = await user_service.authenticate_user(db, username, password)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -20,7 +20,7 @@ class AuthService:
             )
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
-            data={"sub": user.username},
+            data={"sub": user.username, "uid": user.id, "active": user.is_active},
             expires_delta=access_token_expires
         )
         return Token(access_token=access_token, token_type="bearer")
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from app.models.database import AsyncSessionLocal
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+FINISHED = ("done", "failed")
+
+
+@dataclass
+class GenerationJobState:
+    id: str
+    user_id: int
+    technology: str
+    difficulty: str
+    num_questions: int
+    status: str = "queued"
+    questions_generated: int = 0
+    quiz_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "technology": self.technology,
+            "difficulty": self.difficulty,
+            "num_questions": self.num_questions,
+            "questions_generated": self.questions_generated,
+            "quiz_id": self.quiz_id,
+            "error": self.error,
+        }
+
+
+class GenerationJobService:
+    """
+    Runs quiz generation outside the request that asked for it.
+
+    ``submit`` returns immediately with a job id; the generation runs as a
+    task on the event loop with its own database session, so neither the
+    HTTP request nor a pooled connection is held for the length of the LLM
+    call. Job state lives in this process only and finished jobs are
+    forgotten after ``GENERATION_JOB_TTL_SECONDS``.
+    """
+
+    def __init__(self, quiz_service):
+        self.quiz_service = quiz_service
+        self.jobs: Dict[str, GenerationJobState] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def submit(
+        self, technology: str, difficulty: str, num_questions: int, user_id: int
+    ) -> GenerationJobState:
+        self._prune()
+        job = GenerationJobState(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            technology=technology,
+            difficulty=difficulty,
+            num_questions=num_questions,
+        )
+        self.jobs[job.id] = job
+        task = asyncio.create_task(self._run(job))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+        return job
+
+    def get(self, job_id: str, user_id: int) -> Optional[GenerationJobState]:
+        job = self.jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job
+
+    async def wait_for_change(self, event: asyncio.Event, timeout: float) -> bool:
+        """
+        Wait on a job's ``changed`` event, captured before its state was
+        read; False if ``timeout`` passed first.
+        """
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _update(self, job: GenerationJobState, **changes):
+        for name, value in changes.items():
+            setattr(job, name, value)
+        job.updated_at = time.time()
+        # Wake current waiters and start a fresh event for the next change
+        event, job.changed = job.changed, asyncio.Event()
+        event.set()
+
+    def _progress(self, job: GenerationJobState, generated: int):
+        if generated > job.questions_generated:
+            self._update(job, questions_generated=generated)
+
+    async def _run(self, job: GenerationJobState):
+        self._update(job, status="running")
+        try:
+            async with AsyncSessionLocal() as db:
+                quiz = await self.quiz_service.generate_quiz_with_groq(
+                    db,
+                    job.technology,
+                    job.difficulty,
+                    job.num_questions,
+                    user_id=job.user_id,
+                    progress=lambda generated: self._progress(job, generated),
+                )
+            if quiz is None:
+                self._update(job, status="failed", error="Failed to generate quiz")
+            else:
+                self._update(
+                    job,
+                    status="done",
+                    quiz_id=quiz.id,
+                    questions_generated=len(quiz.questions),
+                )
+        except asyncio.CancelledError:
+            self._update(job, status="failed", error="Cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Generation job {job.id} failed: {e}")
+            self._update(job, status="failed", error="Failed to generate quiz")
+
+    def _prune(self):
+        cutoff = time.time() - settings.GENERATION_JOB_TTL_SECONDS
+        for job_id in [
+            job.id
+            for job in self.jobs.values()
+            if job.status in FINISHED and job.updated_at < cutoff
+        ]:
+            del self.jobs[job_id]
+
+    async def stop(self):
+        for task in list(self._tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
@@ -0,0 +1,182 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.database import AsyncSessionLocal
+from app.models.quiz import Quiz, QuizTrend, UserActivity
+from app.services.inventory_service import DIFFICULTIES
+from app.utils.rate_limit import TokenBucket
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Shared by every background GroqClient so all workers stay inside one quota.
+background_rate_limiter = TokenBucket(
+    settings.GROQ_BACKGROUND_REQUESTS_PER_MINUTE, settings.GROQ_BACKGROUND_BURST
+)
+
+
+@dataclass(order=True)
+class GenerationJob:
+    sort_key: float
+    seq: int
+    technology: str = field(compare=False)
+    difficulty: str = field(compare=False)
+    priority: float = field(compare=False)
+    queued_at: float = field(compare=False, default_factory=time.monotonic)
+
+
+class GenerationScheduler:
+    """
+    Prioritized queue of (technology, difficulty) generation jobs served by
+    ``SCHEDULER_WORKERS`` concurrent workers.
+
+    Every plan interval each bucket is scored as demand / (1 + supply), where
+    demand is 1 + the technology's QuizTrend popularity + summed
+    UserActivity interaction and supply is the number of quizzes already in
+    the bucket. The best buckets not already queued or running are enqueued,
+    as long as they score at least ``SCHEDULER_MIN_PRIORITY``; once every
+    bucket's supply has caught up with its demand nothing is generated.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[str, str], Awaitable[Optional[int]]],
+        workers: int = settings.SCHEDULER_WORKERS,
+        rate_limiter: TokenBucket = background_rate_limiter,
+    ):
+        self.generate = generate
+        self.workers = workers
+        self.rate_limiter = rate_limiter
+        self.queue: "asyncio.PriorityQueue[GenerationJob]" = asyncio.PriorityQueue()
+        self.history: deque = deque(maxlen=100)
+        self.completed = 0
+        self.failed = 0
+        self._pending: Set[Tuple[str, str]] = set()
+        self._running: Dict[int, GenerationJob] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._seq = itertools.count()
+        self._stopped = False
+
+    def priorities(self, db: Session) -> List[Tuple[float, str, str]]:
+        trend = dict(db.query(QuizTrend.technology, QuizTrend.popularity_score).all())
+        activity = dict(
+            db.query(UserActivity.technology, func.sum(UserActivity.interaction_score))
+            .group_by(UserActivity.technology)
+            .all()
+        )
+        supply = {
+            (technology, difficulty): count
+            for technology, difficulty, count in db.query(
+                Quiz.technology, Quiz.difficulty, func.count(Quiz.id)
+            )
+            .group_by(Quiz.technology, Quiz.difficulty)
+            .all()
+        }
+
+        scored = []
+        for technology in settings.TOP_TECHNOLOGIES:
+            demand = 1.0 + (trend.get(technology) or 0) + (activity.get(technology) or 0)
+            for difficulty in DIFFICULTIES:
+                available = supply.get((technology, difficulty), 0)
+                scored.append((demand / (1 + available), technology, difficulty))
+        return sorted(scored, reverse=True)
+
+    def plan(self, db: Session) -> int:
+        room = settings.SCHEDULER_JOBS_PER_PLAN - self.queue.qsize()
+        added = 0
+        for priority, technology, difficulty in self.priorities(db):
+            # Sorted by priority, so every remaining bucket is supplied too
+            if added >= room or priority < settings.SCHEDULER_MIN_PRIORITY:
+                break
+            if (technology, difficulty) in self._pending:
+                continue
+            self._pending.add((technology, difficulty))
+            self.queue.put_nowait(
+                GenerationJob(
+                    sort_key=-priority,
+                    seq=next(self._seq),
+                    technology=technology,
+                    difficulty=difficulty,
+                    priority=priority,
+                )
+            )
+            added += 1
+        return added
+
+    async def run(self):
+        self._stopped = False
+        self._tasks = [
+            asyncio.create_task(self._worker(i)) for i in range(self.workers)
+        ]
+        logger.info(f"Generation scheduler started with {self.workers} workers")
+        while not self._stopped:
+            try:
+                async with AsyncSessionLocal() as db:
+                    added = await db.run_sync(self.plan)
+                logger.info(f"Scheduled {added} generation jobs")
+            except Exception as e:
+                logger.error(f"Generation planning failed: {e}")
+            await asyncio.sleep(settings.SCHEDULER_PLAN_INTERVAL_SECONDS)
+
+    async def stop(self):
+        self._stopped = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self, worker_id: int):
+        while True:
+            job = await self.queue.get()
+            self._running[worker_id] = job
+            started = time.monotonic()
+            status = "failed"
+            try:
+                quiz_id = await self.generate(job.technology, job.difficulty)
+                status = "done" if quiz_id else "failed"
+            except asyncio.CancelledError:
+                status = "cancelled"
+                raise
+            except Exception as e:
+                logger.error(f"Generation job {job.technology} failed: {e}")
+            finally:
+                finished = time.monotonic()
+                if status == "done":
+                    self.completed += 1
+                elif status == "failed":
+                    self.failed += 1
+                self.history.append(
+                    {
+                        "technology": job.technology,
+                        "difficulty": job.difficulty,
+                        "priority": round(job.priority, 4),
+                        "status": status,
+                        "wait_seconds": round(started - job.queued_at, 3),
+                        "run_seconds": round(finished - started, 3),
+                    }
+                )
+                self._running.pop(worker_id, None)
+                self._pending.discard((job.technology, job.difficulty))
+                self.queue.task_done()
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue.qsize(),
+            "running": [
+                {"technology": job.technology, "difficulty": job.difficulty}
+                for job in self._running.values()
+            ],
+            "completed": self.completed,
+            "failed": self.failed,
+            "rate_limit_wait_seconds": round(self.rate_limiter.waited_seconds, 3),
+            "recent_jobs": list(self.history)[-20:],
+        }
@@ -0,0 +1,151 @@
+import json
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func
+from sqlalchemy.orm import Session
+
+from app.models.quiz import QuizInventory
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+
+class QuizInventoryService:
+    """
+    Pool of pre-generated quizzes per (technology, difficulty).
+
+    ``take`` hands out one stored quiz that has at least the requested number
+    of questions and removes it from the pool; the background agent keeps
+    every bucket of ``settings.TOP_TECHNOLOGIES`` at
+    ``INVENTORY_TARGET_DEPTH``.
+    """
+
+    _counters: Counter = Counter()
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self._canonical = {t.lower(): t for t in settings.TOP_TECHNOLOGIES}
+
+    def bucket(self, technology: str, difficulty: str) -> Optional[Tuple[str, str]]:
+        """Canonical bucket for a request, or None if the pool does not stock it."""
+        technology = self._canonical.get(technology.strip().lower())
+        difficulty = difficulty.strip().lower()
+        if technology is None or difficulty not in DIFFICULTIES:
+            return None
+        return technology, difficulty
+
+    def take(
+        self, db: Session, technology: str, difficulty: str, num_questions: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Claim a stored quiz for the request. The claim is not committed: it
+        becomes final with the caller's next commit (``QuizWriter.write``
+        storing the quiz), and a failed write rolls it back, leaving the
+        quiz in the pool. On a miss the transaction is rolled back, so the
+        caller holds no connection while it generates the quiz instead.
+        """
+        bucket = self.bucket(technology, difficulty)
+        if not settings.INVENTORY_ENABLED or bucket is None:
+            return None
+
+        for _ in range(3):
+            candidate = (
+                db.query(QuizInventory.id, QuizInventory.payload)
+                .filter(
+                    QuizInventory.technology == bucket[0],
+                    QuizInventory.difficulty == bucket[1],
+                    QuizInventory.num_questions >= num_questions,
+                )
+                .order_by(QuizInventory.id)
+                .with_for_update(skip_locked=True)
+                .first()
+            )
+            if candidate is None:
+                break
+
+            # Whoever deletes the row owns it; a concurrent taker gets 0 rows.
+            claimed = db.execute(
+                delete(QuizInventory).where(QuizInventory.id == candidate.id)
+            ).rowcount
+            if claimed:
+                self._count("hits", bucket)
+                data = json.loads(candidate.payload)
+                data["questions"] = data["questions"][:num_questions]
+                data["num_questions"] = len(data["questions"])
+                return data
+
+        db.rollback()
+        self._count("misses", bucket)
+        return None
+
+    def add(self, db: Session, technology: str, difficulty: str, data: Dict[str, Any]):
+        db.add(
+            QuizInventory(
+                technology=technology,
+                difficulty=difficulty,
+                num_questions=len(data["questions"]),
+                payload=json.dumps(data),
+            )
+        )
+        db.commit()
+
+    def depths(self, db: Session) -> Dict[Tuple[str, str], int]:
+        rows = (
+            db.query(
+                QuizInventory.technology,
+                QuizInventory.difficulty,
+                func.count(QuizInventory.id),
+            )
+            .group_by(QuizInventory.technology, QuizInventory.difficulty)
+            .all()
+        )
+        depths = {
+            (technology, difficulty): 0
+            for technology in settings.TOP_TECHNOLOGIES
+            for difficulty in DIFFICULTIES
+        }
+        depths.update({(t, d): count for t, d, count in rows})
+        return depths
+
+    def shortfall(self, db: Session) -> List[Tuple[str, str, int]]:
+        """Buckets below target depth, emptiest first."""
+        missing = [
+            (technology, difficulty, settings.INVENTORY_TARGET_DEPTH - depth)
+            for (technology, difficulty), depth in self.depths(db).items()
+            if depth < settings.INVENTORY_TARGET_DEPTH
+        ]
+        return sorted(missing, key=lambda item: -item[2])
+
+    def stats(self, db: Session) -> Dict[str, Any]:
+        depths = self.depths(db)
+        with self._lock:
+            counters = dict(self._counters)
+        hits = sum(v for (kind, _), v in counters.items() if kind == "hits")
+        misses = sum(v for (kind, _), v in counters.items() if kind == "misses")
+        return {
+            "target_depth": settings.INVENTORY_TARGET_DEPTH,
+            "total_depth": sum(depths.values()),
+            "empty_buckets": sum(1 for depth in depths.values() if depth == 0),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else None,
+            "buckets": [
+                {
+                    "technology": t,
+                    "difficulty": d,
+                    "depth": depth,
+                    "hits": counters.get(("hits", (t, d)), 0),
+                    "misses": counters.get(("misses", (t, d)), 0),
+                }
+                for (t, d), depth in sorted(depths.items())
+            ],
+        }
+
+    def _count(self, kind: str, bucket: Tuple[str, str]):
+        with self._lock:
+            self._counters[(kind, bucket)] += 1
@@ -1,10 +1,187 @@
+import bisect
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+
+from app.models.quiz import QuizAttempt, UserScore
 from app.models.user import User
-from typing import List, Dict
+from config import settings
+
+
+class LeaderboardIndex:
+    """
+    In-process copy of ``user_scores`` kept sorted by (-total_score, user_id),
+    so top-N is a slice and a user's rank is a binary search.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[int, int]] = []
+        self._scores: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.loaded_at: Optional[float] = None
+
+    def load(self, rows: Iterable[Tuple[int, int]]) -> None:
+        scores = {user_id: total for user_id, total in rows}
+        keys = sorted((-total, user_id) for user_id, total in scores.items())
+        with self._lock:
+            self._scores = scores
+            self._keys = keys
+            self.loaded_at = time.monotonic()
+
+    def set_score(self, user_id: int, total_score: int) -> None:
+        with self._lock:
+            old = self._scores.get(user_id)
+            if old is not None:
+                i = bisect.bisect_left(self._keys, (-old, user_id))
+                if i < len(self._keys) and self._keys[i] == (-old, user_id):
+                    del self._keys[i]
+            self._scores[user_id] = total_score
+            bisect.insort(self._keys, (-total_score, user_id))
+
+    def top(self, limit: int) -> List[Tuple[int, int]]:
+        with self._lock:
+            return [(user_id, -neg) for neg, user_id in self._keys[:limit]]
+
+    def rank(self, user_id: int) -> Optional[Tuple[int, int]]:
+        """(rank, total_score) for a user, or None if they have no attempts."""
+        with self._lock:
+            total = self._scores.get(user_id)
+            if total is None:
+                return None
+            return bisect.bisect_left(self._keys, (-total, user_id)) + 1, total
+
+    def is_stale(self, max_age: float) -> bool:
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > max_age
+
+
+leaderboard_index = LeaderboardIndex()
 
 
 class LeaderboardService:
-    def get_leaderboard(self, db: Session, skip: int = 0, limit: int = 10):
+    """
+    ``user_scores`` is the source of truth and is updated in the same
+    transaction as the attempt. Each process serves reads from
+    ``leaderboard_index`` and reloads it from the rollup every
+    ``LEADERBOARD_REFRESH_SECONDS`` to pick up other workers' writes.
+    """
+
+    def __init__(self, index: LeaderboardIndex = leaderboard_index):
+        self.index = index
+
+    def record_attempt(self, db: Session, user_id: int, score: int) -> int:
+        """Add an attempt to the rollup without committing; returns the new total."""
+        total = self._increment(db, user_id, score)
+        if total is None:
+            try:
+                with db.begin_nested():
+                    db.execute(
+                        insert(UserScore).values(
+                            user_id=user_id, total_score=score, attempts=1
+                        )
+                    )
+                total = score
+            except IntegrityError:
+                # Another request created the row first.
+                total = self._increment(db, user_id, score)
+        return total
+
+    def publish(self, user_id: int, total_score: int) -> None:
+        """Apply a committed rollup change to the in-process index."""
+        if self.index.loaded_at is not None:
+            self.index.set_score(user_id, total_score)
+
+    def get_leaderboard(self, db: Session, limit: int = 50) -> List[Dict]:
+        self._ensure_fresh(db)
+        top = self.index.top(limit)
+        usernames = {}
+        if top:
+            usernames = dict(
+                db.query(User.id, User.username)
+                .filter(User.id.in_([user_id for user_id, _ in top]))
+                .all()
+            )
+
+        return [
+            {
+                "username": usernames.get(user_id),
+                "total_score": total_score,
+                "rank": idx + 1,
+            }
+            for idx, (user_id, total_score) in enumerate(top)
+        ]
+
+    def get_user_rank(self, db: Session, user_id: int) -> Dict:
+        self._ensure_fresh(db)
+        found = self.index.rank(user_id)
+        if found is None:
+            return {"rank": None, "total_score": 0}
+        rank, total_score = found
+        return {"rank": rank, "total_score": total_score}
+
+    def rebuild(self, db: Session) -> int:
+        """Recompute ``user_scores`` from raw attempts. Returns the row count."""
+        db.execute(delete(UserScore))
+        db.execute(
+            insert(UserScore).from_select(
+                ["user_id", "total_score", "attempts"],
+                self._aggregate_attempts(),
+            )
+        )
+        db.commit()
+        self._load(db)
+        return db.query(func.count(UserScore.user_id)).scalar()
+
+    def find_drift(self, db: Session) -> List[Dict]:
+        """Users whose rollup disagrees with their raw attempts."""
+        expected = {
+            row.user_id: (row.total_score, row.attempts)
+            for row in db.execute(self._aggregate_attempts())
+        }
+        actual = {
+            row.user_id: (row.total_score, row.attempts)
+            for row in db.query(
+                UserScore.user_id, UserScore.total_score, UserScore.attempts
+            )
+        }
+        return [
+            {
+                "user_id": user_id,
+                "expected": expected.get(user_id),
+                "actual": actual.get(user_id),
+            }
+            for user_id in sorted(expected.keys() | actual.keys())
+            if expected.get(user_id) != actual.get(user_id)
+        ]
+
+    def _increment(self, db: Session, user_id: int, score: int) -> Optional[int]:
+        return db.execute(
+            update(UserScore)
+            .where(UserScore.user_id == user_id)
+            .values(
+                total_score=UserScore.total_score + score,
+                attempts=UserScore.attempts + 1,
+            )
+            .returning(UserScore.total_score)
+        ).scalar()
+
+    def _aggregate_attempts(self):
         return (
-            db.query(User).order_by(User.points.desc()).offset(skip).limit(limit).all()
+            select(
+                QuizAttempt.user_id,
+                func.coalesce(func.sum(QuizAttempt.score), 0).label("total_score"),
+                func.count(QuizAttempt.id).label("attempts"),
+            )
+            .join(User, QuizAttempt.user_id == User.id)
+            .group_by(QuizAttempt.user_id)
         )
+
+    def _ensure_fresh(self, db: Session) -> None:
+        if self.index.is_stale(settings.LEADERBOARD_REFRESH_SECONDS):
+            self._load(db)
+
+    def _load(self, db: Session) -> None:
+        self.index.load(db.query(UserScore.user_id, UserScore.total_score).all())
@@ -1,27 +1,66 @@
-from typing import List, Optional
+import logging
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, List, Optional
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import asc
+from sqlalchemy.orm import Session, Query, selectinload
+from sqlalchemy import asc, func, insert, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.database import AsyncSessionLocal
 from app.models.quiz import Quiz, Question, Option, QuizAttempt, UserAnswer
 from app.schemas.quiz import (
+    QuestionOut,
+    QuizOut,
     QuizAttemptCreate,
     QuizCreate,
     QuestionCreate,
     OptionCreate,
     AnswerSubmission,
 )
+from app.services.inventory_service import QuizInventoryService
+from app.services.leaderboard_service import LeaderboardService
+from app.services.quiz_writer import QuizWriter
 from app.utils.groq_client import GroqClient
+from app.utils.pagination import ApproximateCounter, decode_cursor, encode_cursor
+from app.utils.quiz_cache import CachedQuiz, quiz_payload_cache
+from app.utils.single_flight import SingleFlight
 from datetime import datetime, timezone
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Loads questions and their options with one extra SELECT per level, so a
+# quiz (or a page of quizzes) always costs the same number of queries.
+QUIZ_CONTENT = selectinload(Quiz.questions).selectinload(Question.options)
+
+# Columns needed to render a listing entry; full content is fetched by id.
+QUIZ_SUMMARY_COLUMNS = (
+    Quiz.id,
+    Quiz.title,
+    Quiz.technology,
+    Quiz.difficulty,
+    Quiz.num_questions,
+    Quiz.created_at,
+    Quiz.is_ai_generated,
+)
+
+quiz_counter = ApproximateCounter(settings.QUIZ_COUNT_CACHE_SECONDS)
 
 
 class QuizService:
     def __init__(self):
         self.groq_client = GroqClient()
+        self.quiz_writer = QuizWriter()
+        self.leaderboard = LeaderboardService()
+        self.inventory = QuizInventoryService()
+        self.single_flight = SingleFlight()
 
-    def create_quiz_from_schema(
-        self, db: Session, quiz_data: QuizCreate, user_id: int
+    async def create_quiz_from_schema(
+        self, db: AsyncSession, quiz_data: QuizCreate, user_id: int
     ) -> Quiz:
-        quiz = Quiz(
+        # run_sync drives the sync writer over the asyncio driver, so the
+        # event loop is free while the statements are in flight
+        quiz_id = await db.run_sync(
+            self.quiz_writer.write,
             title=quiz_data.title,
             description=quiz_data.description,
             technology=quiz_data.technology,
@@ -29,47 +68,175 @@ class QuizService:
             num_questions=quiz_data.num_questions,
             created_by=user_id,
             is_public=quiz_data.is_public,
+            questions=[q.model_dump() for q in quiz_data.questions],
         )
-        db.add(quiz)
-        db.commit()
-        db.refresh(quiz)
-
-        for question_data in quiz_data.questions:
-            question = Question(
-                quiz_id=quiz.id,
-                question_text=question_data.question_text,
-                explanation=question_data.explanation,
-            )
-            db.add(question)
-            db.commit()
-            db.refresh(question)
+        return await db.run_sync(self.load_quiz, quiz_id)
 
-            for option_data in question_data.options:
-                option = Option(
-                    question_id=question.id,
-                    option_text=option_data.option_text,
-                    is_correct=option_data.is_correct,
+    async def generate_quiz_with_groq(
+        self,
+        db: AsyncSession,
+        technology: str,
+        difficulty: str,
+        num_questions: int,
+        user_id: int,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> Optional[Quiz]:
+        data = await db.run_sync(
+            self.inventory.take, technology, difficulty, num_questions
+        )
+        if data is None:
+            # Identical concurrent requests share one Groq call
+            key = (technology.strip().lower(), difficulty.strip().lower(), num_questions)
+            mode = settings.GENERATION_SINGLE_FLIGHT_MODE
+            if mode == "shared":
+                quiz_id = await self.single_flight.do(
+                    ("shared",) + key,
+                    lambda report: self._generate_and_store(
+                        technology, difficulty, num_questions, user_id, report
+                    ),
+                    progress,
                 )
-                db.add(option)
+                return await db.run_sync(self.load_quiz, quiz_id) if quiz_id else None
+            if mode == "copy":
+                data = await self.single_flight.do(
+                    key,
+                    lambda report: self.groq_client.generate_quiz(
+                        technology, difficulty, num_questions, report
+                    ),
+                    progress,
+                )
+            else:
+                data = await self.groq_client.generate_quiz(
+                    technology, difficulty, num_questions, progress
+                )
+        if not data:
+            return None
 
-        db.commit()
-        return quiz
+        quiz_id = await db.run_sync(
+            self._store_generated, data, technology, difficulty, num_questions, user_id
+        )
+        return await db.run_sync(self.load_quiz, quiz_id)
 
-    async def generate_quiz_with_groq(
+    async def _generate_and_store(
         self,
-        db: Session,
         technology: str,
         difficulty: str,
         num_questions: int,
         user_id: int,
-    ) -> Optional[Quiz]:
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> Optional[int]:
         data = await self.groq_client.generate_quiz(
-            technology, difficulty, num_questions
+            technology, difficulty, num_questions, progress
         )
         if not data:
             return None
+        # Own session: the request that started the flight may finish first.
+        async with AsyncSessionLocal() as db:
+            return await db.run_sync(
+                self._store_generated,
+                data,
+                technology,
+                difficulty,
+                num_questions,
+                user_id,
+            )
+
+    async def stream_quiz_generation(
+        self, technology: str, difficulty: str, num_questions: int, user_id: int
+    ) -> AsyncIterator[dict]:
+        """
+        Generate a quiz and yield events as it is built: ``quiz`` with the new
+        id, one ``question`` per question as soon as it is validated and
+        saved, then ``done`` or ``error``. The quiz stays private until it is
+        complete. Uses its own session so no request session is held open
+        for the length of the stream.
+        """
+        async with AsyncSessionLocal() as db:
+            data = await db.run_sync(
+                self.inventory.take, technology, difficulty, num_questions
+            )
+            if data is not None:
+                quiz_id = await db.run_sync(
+                    self._store_generated,
+                    data,
+                    technology,
+                    difficulty,
+                    num_questions,
+                    user_id,
+                )
+                quiz = await db.run_sync(self.load_quiz, quiz_id)
+                yield {"event": "quiz", "quiz_id": quiz_id}
+                for index, question in enumerate(quiz.questions, start=1):
+                    yield {
+                        "event": "question",
+                        "index": index,
+                        "question": QuestionOut.model_validate(question).model_dump(
+                            mode="json"
+                        ),
+                    }
+                yield {
+                    "event": "done",
+                    "quiz_id": quiz_id,
+                    "num_questions": len(quiz.questions),
+                }
+                return
+
+            quiz_id = await db.run_sync(
+                self.quiz_writer.write,
+                title=f"{technology} {difficulty.capitalize()} Quiz",
+                description=f"A {difficulty}-level quiz about {technology}",
+                technology=technology,
+                difficulty=difficulty,
+                num_questions=0,
+                created_by=user_id,
+                questions=[],
+                is_public=False,
+            )
+            saved = 0
+            error = None
+            # The placeholder must be published or deleted however the stream
+            # ends, including a client disconnect (GeneratorExit) or a
+            # cancelled request, which ``except Exception`` does not see.
+            try:
+                yield {"event": "quiz", "quiz_id": quiz_id}
+                async with aclosing(
+                    self.groq_client.stream_quiz(technology, difficulty, num_questions)
+                ) as questions:
+                    async for question in questions:
+                        (stored,) = await db.run_sync(
+                            self.quiz_writer.append, quiz_id, technology, [question]
+                        )
+                        saved += 1
+                        yield {"event": "question", "index": saved, "question": stored}
+            except Exception as e:
+                logger.warning(
+                    f"Streaming quiz {quiz_id} stopped after {saved} questions: {e}"
+                )
+                error = "Failed to generate quiz from Groq API"
+            finally:
+                if saved:
+                    await db.run_sync(
+                        self.quiz_writer.finish, quiz_id, num_questions=saved
+                    )
+                else:
+                    await db.run_sync(self.quiz_writer.discard, quiz_id)
+
+            if not saved:
+                yield {"event": "error", "detail": error or "No questions generated"}
+                return
+            yield {"event": "done", "quiz_id": quiz_id, "num_questions": saved}
 
-        quiz = Quiz(
+    def _store_generated(
+        self,
+        db: Session,
+        data: dict,
+        technology: str,
+        difficulty: str,
+        num_questions: int,
+        user_id: int,
+    ) -> int:
+        return self.quiz_writer.write(
+            db,
             title=data["title"],
             description=data.get("description", ""),
             technology=technology,
@@ -78,103 +245,194 @@ class QuizService:
             created_by=user_id,
             is_public=True,
             is_ai_generated=False,
+            questions=data["questions"],
         )
-        db.add(quiz)
-        db.commit()
-        db.refresh(quiz)
-
-        for q in data["questions"]:
-            question = Question(
-                quiz_id=quiz.id,
-                question_text=q["question_text"],
-                explanation=q.get("explanation", ""),
-            )
-            db.add(question)
-            db.commit()
-            db.refresh(question)
-
-            for o in q["options"]:
-                option = Option(
-                    question_id=question.id,
-                    option_text=o["option_text"],
-                    is_correct=o["is_correct"],
-                )
-                db.add(option)
 
-        db.commit()
-        return quiz
+    def load_quiz(self, db: Session, quiz_id: int) -> Optional[Quiz]:
+        return (
+            db.query(Quiz).options(QUIZ_CONTENT).filter(Quiz.id == quiz_id).first()
+        )
 
-    def get_public_quizzes(self, db: Session, page: int = 1, limit: int = 10):
-        skip = (page - 1) * limit
-        total = db.query(Quiz).filter(Quiz.is_public == True).count()
+    def load_quizzes(self, query: Query, skip: int, limit: int) -> List[Quiz]:
+        return query.options(QUIZ_CONTENT).offset(skip).limit(limit).all()
 
-        quizzes = (
-            db.query(Quiz)
-            .filter(Quiz.is_public == True)
-            .order_by(Quiz.created_at.asc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+    def get_public_quizzes(
+        self,
+        db: Session,
+        page: int = 1,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        summary: bool = False,
+    ):
+        return self._paginate(
+            db,
+            Quiz.is_public == True,
+            count_key=("public",),
+            descending=False,
+            page=page,
+            limit=limit,
+            cursor=cursor,
+            with_total=with_total,
+            summary=summary,
         )
 
-        return {
-            "page": page,
-            "limit": limit,
-            "total_results": total,
-            "results": quizzes,
-        }
-
     def get_user_quizzes(
-        self, db: Session, user_id: int, page: int = 1, limit: int = 10
+        self,
+        db: Session,
+        user_id: int,
+        page: int = 1,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        summary: bool = False,
     ):
-        skip = (page - 1) * limit
-        total = db.query(Quiz).filter(Quiz.created_by == user_id).count()
-
-        quizzes = (
-            db.query(Quiz)
-            .filter(Quiz.created_by == user_id)
-            .order_by(Quiz.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+        return self._paginate(
+            db,
+            Quiz.created_by == user_id,
+            count_key=("user", user_id),
+            descending=True,
+            page=page,
+            limit=limit,
+            cursor=cursor,
+            with_total=with_total,
+            summary=summary,
         )
 
+    def _paginate(
+        self,
+        db: Session,
+        criterion,
+        count_key: tuple,
+        descending: bool,
+        page: int,
+        limit: int,
+        cursor: Optional[str],
+        with_total: bool,
+        summary: bool = False,
+    ):
+        """
+        Keyset pagination on (created_at, id). Without a cursor the legacy
+        ``page`` offset is honoured so existing clients keep working.
+        ``summary`` selects only the listing columns instead of full quizzes.
+        """
+        if summary:
+            query = db.query(*QUIZ_SUMMARY_COLUMNS).filter(criterion)
+        else:
+            query = db.query(Quiz).filter(criterion)
+        if descending:
+            query = query.order_by(Quiz.created_at.desc(), Quiz.id.desc())
+        else:
+            query = query.order_by(Quiz.created_at.asc(), Quiz.id.asc())
+
+        skip = 0
+        if cursor:
+            created_at, last_id = decode_cursor(cursor)
+            position = tuple_(Quiz.created_at, Quiz.id)
+            query = query.filter(
+                position < (created_at, last_id)
+                if descending
+                else position > (created_at, last_id)
+            )
+        else:
+            skip = (page - 1) * limit
+
+        # One extra row tells us whether there is a next page without a count.
+        if summary:
+            quizzes = query.offset(skip).limit(limit + 1).all()
+        else:
+            quizzes = self.load_quizzes(query, skip, limit + 1)
+        next_cursor = None
+        if len(quizzes) > limit:
+            quizzes = quizzes[:limit]
+            next_cursor = encode_cursor(quizzes[-1].created_at, quizzes[-1].id)
+
+        total = None
+        if with_total:
+            total = quiz_counter.get(
+                count_key,
+                lambda: db.query(func.count(Quiz.id)).filter(criterion).scalar(),
+            )
+
         return {
             "page": page,
             "limit": limit,
             "total_results": total,
+            "next_cursor": next_cursor,
             "results": quizzes,
         }
 
     def create_quiz_attempt(
         self, db: Session, attempt_data: QuizAttemptCreate, user_id: int
     ) -> QuizAttempt:
-        attempt = QuizAttempt(
-            user_id=user_id,
-            quiz_id=attempt_data.quiz_id,
-            score=attempt_data.score,
-            total_questions=attempt_data.total_questions,
-            completed_at=datetime.now(timezone.utc),
+        quiz_row = (
+            db.query(Quiz.id, func.count(Question.id).label("question_count"))
+            .outerjoin(Question, Question.quiz_id == Quiz.id)
+            .filter(Quiz.id == attempt_data.quiz_id)
+            .group_by(Quiz.id)
+            .first()
         )
-        db.add(attempt)
-        db.commit()
-        db.refresh(attempt)
+        if not quiz_row:
+            raise HTTPException(status_code=404, detail="Quiz not found")
 
-        for answer in attempt_data.answers:
-            option = (
-                db.query(Option).filter(Option.id == answer.selected_option_id).first()
+        question_ids = [answer.question_id for answer in attempt_data.answers]
+        if len(set(question_ids)) != len(question_ids):
+            raise HTTPException(
+                status_code=400, detail="Each question can only be answered once"
+            )
+
+        # Resolve every selected option in one query, restricted to this quiz.
+        option_ids = [answer.selected_option_id for answer in attempt_data.answers]
+        options = {}
+        if option_ids:
+            rows = (
+                db.query(Option.id, Option.question_id, Option.is_correct)
+                .join(Question, Option.question_id == Question.id)
+                .filter(Option.id.in_(option_ids), Question.quiz_id == quiz_row.id)
+                .all()
             )
-            is_correct = option.is_correct if option else False
+            options = {row.id: row for row in rows}
 
-            user_answer = UserAnswer(
-                attempt_id=attempt.id,
-                question_id=answer.question_id,
-                selected_option_id=answer.selected_option_id,
-                is_correct=is_correct,
+        answer_rows = []
+        for answer in attempt_data.answers:
+            option = options.get(answer.selected_option_id)
+            if option is None or option.question_id != answer.question_id:
+                raise HTTPException(
+                    status_code=400,
+                    detail=(
+                        f"Option {answer.selected_option_id} does not belong to "
+                        f"question {answer.question_id} of this quiz"
+                    ),
+                )
+            answer_rows.append(
+                {
+                    "question_id": answer.question_id,
+                    "selected_option_id": answer.selected_option_id,
+                    "is_correct": bool(option.is_correct),
+                }
             )
-            db.add(user_answer)
 
-        db.commit()
+        attempt = QuizAttempt(
+            user_id=user_id,
+            quiz_id=quiz_row.id,
+            score=sum(1 for row in answer_rows if row["is_correct"]),
+            total_questions=quiz_row.question_count,
+            completed_at=datetime.now(timezone.utc),
+        )
+        try:
+            db.add(attempt)
+            db.flush()
+            if answer_rows:
+                for row in answer_rows:
+                    row["attempt_id"] = attempt.id
+                db.execute(insert(UserAnswer), answer_rows)
+            total_score = self.leaderboard.record_attempt(db, user_id, attempt.score)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        self.leaderboard.publish(user_id, total_score)
         return attempt
 
     def get_user_attempts(self, db: Session, user_id: int) -> List[QuizAttempt]:
@@ -186,16 +444,32 @@ class QuizService:
         )
 
     def get_quiz_by_id(self, db: Session, quiz_id: int, current_user_id: Optional[int] = None):
-        quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+        quiz = self.load_quiz(db, quiz_id)
         if not quiz:
             raise HTTPException(status_code=404, detail="Quiz not found")
 
+        self._check_quiz_access(quiz.is_public, quiz.created_by, current_user_id)
+        return quiz
+
+    def get_quiz_payload(
+        self, db: Session, quiz_id: int, current_user_id: Optional[int] = None
+    ) -> CachedQuiz:
+        """Serialized ``QuizOut`` for a quiz, served from the payload cache when possible"""
+        cached = quiz_payload_cache.get(quiz_id)
+        if cached:
+            self._check_quiz_access(cached.is_public, cached.created_by, current_user_id)
+            return cached
+
+        quiz = self.get_quiz_by_id(db, quiz_id, current_user_id)
+        body = QuizOut.model_validate(quiz).model_dump_json().encode()
+        return quiz_payload_cache.put(quiz.id, body, quiz.is_public, quiz.created_by)
+
+    def _check_quiz_access(
+        self, is_public: bool, created_by: Optional[int], current_user_id: Optional[int]
+    ):
         # Only enforce access check if the quiz is private
-        if not quiz.is_public:
-            if current_user_id is None or quiz.created_by != current_user_id:
+        if not is_public:
+            if current_user_id is None or created_by != current_user_id:
                 raise HTTPException(
                     status_code=403, detail="You do not have access to this quiz"
                 )
-
-        return quiz
-
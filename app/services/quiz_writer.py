@@ -0,0 +1,193 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+
+from app.models.quiz import Quiz, Question, Option
+from app.utils.question_index import question_index
+from app.utils.quiz_cache import quiz_payload_cache
+
+
+class QuizWriter:
+    """
+    Persist a quiz with its questions and options in a single transaction
+    and return the new quiz id.
+
+    Uses one INSERT for the quiz, one multi-row INSERT ... RETURNING for the
+    questions and one executemany for the options, so the number of round
+    trips does not grow with the number of questions. Nothing is committed
+    unless every row was written.
+    """
+
+    def write(
+        self,
+        db: Session,
+        *,
+        title: str,
+        description: Optional[str],
+        technology: str,
+        difficulty: str,
+        num_questions: int,
+        created_by: int,
+        questions: Iterable[Dict[str, Any]],
+        is_public: bool = True,
+        is_ai_generated: bool = False,
+        created_at: Optional[datetime] = None,
+    ) -> int:
+        questions = list(questions)
+        quiz_values = {
+            "title": title,
+            "description": description,
+            "technology": technology,
+            "difficulty": difficulty,
+            "num_questions": num_questions,
+            "created_by": created_by,
+            "is_public": is_public,
+            "is_ai_generated": is_ai_generated,
+        }
+        if created_at is not None:
+            quiz_values["created_at"] = created_at
+
+        try:
+            quiz_id = db.execute(
+                insert(Quiz).values(**quiz_values).returning(Quiz.id)
+            ).scalar_one()
+
+            question_ids = self._insert_questions(db, quiz_id, questions, created_at)
+            option_rows = self._option_rows(question_ids, questions)
+            if option_rows:
+                db.execute(insert(Option), option_rows)
+
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        quiz_payload_cache.invalidate(quiz_id)
+        self._index(technology, question_ids, questions)
+        return quiz_id
+
+    def append(
+        self,
+        db: Session,
+        quiz_id: int,
+        technology: str,
+        questions: Iterable[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Add questions to an existing quiz and commit, for quizzes saved while
+        they are still being generated. Returns the stored questions with
+        their new ids, in the shape of ``QuestionOut``.
+        """
+        questions = list(questions)
+        try:
+            question_ids = self._insert_questions(db, quiz_id, questions, None)
+            option_rows = self._option_rows(question_ids, questions)
+            option_ids = []
+            if option_rows:
+                option_ids = list(
+                    db.execute(
+                        insert(Option).returning(
+                            Option.id, sort_by_parameter_order=True
+                        ),
+                        option_rows,
+                    ).scalars()
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        quiz_payload_cache.invalidate(quiz_id)
+        self._index(technology, question_ids, questions)
+        option_ids = iter(option_ids)
+        return [
+            {
+                "id": question_id,
+                "quiz_id": quiz_id,
+                "question_text": q["question_text"],
+                "explanation": q.get("explanation", ""),
+                "options": [
+                    {"id": next(option_ids), **row}
+                    for row in self._option_rows([question_id], [q])
+                ],
+            }
+            for question_id, q in zip(question_ids, questions)
+        ]
+
+    def finish(
+        self, db: Session, quiz_id: int, num_questions: int, is_public: bool = True
+    ) -> None:
+        """Record the final question count of an appended quiz and publish it."""
+        try:
+            db.execute(
+                update(Quiz)
+                .where(Quiz.id == quiz_id)
+                .values(num_questions=num_questions, is_public=is_public)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        quiz_payload_cache.invalidate(quiz_id)
+
+    def discard(self, db: Session, quiz_id: int) -> None:
+        """Delete a quiz that never received any questions."""
+        try:
+            db.execute(delete(Quiz).where(Quiz.id == quiz_id))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        quiz_payload_cache.invalidate(quiz_id)
+
+    @staticmethod
+    def _index(
+        technology: str, question_ids: List[int], questions: List[Dict[str, Any]]
+    ):
+        for question_id, q in zip(question_ids, questions):
+            question_index.add(technology, question_id, q["question_text"])
+
+    @staticmethod
+    def _option_rows(
+        question_ids: List[int], questions: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        return [
+            {
+                "question_id": question_id,
+                "option_text": o["option_text"],
+                "is_correct": o["is_correct"],
+            }
+            for question_id, q in zip(question_ids, questions)
+            for o in q["options"]
+        ]
+
+    def _insert_questions(
+        self,
+        db: Session,
+        quiz_id: int,
+        questions: List[Dict[str, Any]],
+        created_at: Optional[datetime],
+    ) -> List[int]:
+        if not questions:
+            return []
+
+        rows = []
+        for q in questions:
+            row = {
+                "quiz_id": quiz_id,
+                "question_text": q["question_text"],
+                "explanation": q.get("explanation", ""),
+            }
+            if created_at is not None:
+                row["created_at"] = created_at
+            rows.append(row)
+
+        # sort_by_parameter_order keeps the returned ids aligned with ``rows``
+        # so options can be attached to the right question.
+        result = db.execute(
+            insert(Question).returning(Question.id, sort_by_parameter_order=True),
+            rows,
+        )
+        return list(result.scalars())
@@ -0,0 +1,233 @@
+import json
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.database import SessionLocal
+from app.models.quiz import Quiz, QuizAttempt, UserActivity, UserRecommendation
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Quizzes stored per user; each request samples RECOMMENDATION_LIMIT of them
+STORED_RECOMMENDATIONS = 30
+TECHNOLOGIES_PER_USER = 5
+CANDIDATES_PER_TECHNOLOGY = 50
+# How much the technologies similar to a user's own add to their score
+NEIGHBOUR_WEIGHT = 0.5
+INSERT_BATCH_SIZE = 1000
+# pg_try_advisory_xact_lock key held by the worker rebuilding the table
+REBUILD_LOCK_KEY = 0x7265636F
+
+
+class RecommendationEngine:
+    """
+    Batch recommendations from ``user_activities``.
+
+    Builds a users x technologies affinity matrix whose entries are the
+    interaction scores decayed by the time since the last interaction, and
+    adds to it the affinity for similar technologies, where similarity is
+    the cosine between technology columns (users who practise one also
+    practise the other). Each user's top technologies are then filled with
+    the newest public quizzes they have not attempted and written to
+    ``user_recommendations``, which the recommendations endpoint reads
+    with a single key lookup.
+    """
+
+    def __init__(self, half_life_days: float):
+        self.half_life_days = half_life_days
+        self.last_build: Optional[Dict] = None
+
+    def affinity_matrix(self, db: Session, now: datetime):
+        rows = (
+            db.query(
+                UserActivity.user_id,
+                UserActivity.technology,
+                UserActivity.interaction_score,
+                UserActivity.last_interaction,
+            )
+            .filter(
+                UserActivity.user_id.isnot(None), UserActivity.technology.isnot(None)
+            )
+            .all()
+        )
+        users = sorted({row.user_id for row in rows})
+        technologies = sorted({row.technology for row in rows})
+        user_index = {user_id: i for i, user_id in enumerate(users)}
+        technology_index = {technology: j for j, technology in enumerate(technologies)}
+
+        user_cells = np.array([user_index[row.user_id] for row in rows], dtype=np.int64)
+        technology_cells = np.array(
+            [technology_index[row.technology] for row in rows], dtype=np.int64
+        )
+        scores = np.array([row.interaction_score or 0.0 for row in rows])
+        age_days = np.array(
+            [
+                (now - row.last_interaction).total_seconds() / 86400
+                if row.last_interaction
+                else 0.0
+                for row in rows
+            ]
+        )
+        weights = scores * np.exp2(-np.maximum(age_days, 0.0) / self.half_life_days)
+
+        affinity = np.zeros((len(users), len(technologies)))
+        # Sums duplicate (user, technology) rows instead of keeping the last
+        np.add.at(affinity, (user_cells, technology_cells), weights)
+        return users, technologies, affinity
+
+    @staticmethod
+    def technology_similarity(affinity: np.ndarray) -> np.ndarray:
+        """Cosine similarity between technology columns, zero on the diagonal."""
+        norms = np.linalg.norm(affinity, axis=0)
+        normalized = affinity / np.where(norms > 0, norms, 1.0)
+        similarity = normalized.T @ normalized
+        np.fill_diagonal(similarity, 0.0)
+        return similarity
+
+    def score(self, affinity: np.ndarray) -> np.ndarray:
+        similarity = self.technology_similarity(affinity)
+        return affinity + NEIGHBOUR_WEIGHT * (affinity @ similarity)
+
+    def _candidates(self, db: Session, technologies: List[str]) -> Dict[str, List]:
+        """Newest public quizzes per technology: [id, title, technology, difficulty]."""
+        ranked = (
+            select(
+                Quiz.id,
+                Quiz.title,
+                Quiz.technology,
+                Quiz.difficulty,
+                func.row_number()
+                .over(partition_by=Quiz.technology, order_by=Quiz.id.desc())
+                .label("position"),
+            )
+            .where(Quiz.is_public == True, Quiz.technology.in_(technologies))
+            .subquery()
+        )
+        rows = db.execute(
+            select(
+                ranked.c.id, ranked.c.title, ranked.c.technology, ranked.c.difficulty
+            )
+            .where(ranked.c.position <= CANDIDATES_PER_TECHNOLOGY)
+            .order_by(ranked.c.technology, ranked.c.id.desc())
+        ).all()
+        candidates: Dict[str, List] = defaultdict(list)
+        for row in rows:
+            candidates[row.technology].append(list(row))
+        return candidates
+
+    def _attempted(self, db: Session, quiz_ids: List[int]) -> Dict[int, Set[int]]:
+        attempted: Dict[int, Set[int]] = defaultdict(set)
+        if quiz_ids:
+            rows = (
+                db.query(QuizAttempt.user_id, QuizAttempt.quiz_id)
+                .filter(QuizAttempt.quiz_id.in_(quiz_ids))
+                .all()
+            )
+            for user_id, quiz_id in rows:
+                attempted[user_id].add(quiz_id)
+        return attempted
+
+    def build(self, db: Session) -> Optional[int]:
+        """
+        Recompute every user's recommendations and replace the stored ones
+        in one transaction. Returns the number of users written, or None when
+        another worker is already rebuilding (PostgreSQL only; the advisory
+        lock is released when that worker's transaction ends).
+        """
+        if db.bind.dialect.name == "postgresql" and not db.scalar(
+            select(func.pg_try_advisory_xact_lock(REBUILD_LOCK_KEY))
+        ):
+            db.rollback()
+            logger.info("Recommendations are being rebuilt by another worker")
+            return None
+        started = time.perf_counter()
+        users, technologies, affinity = self.affinity_matrix(db, datetime.utcnow())
+        entries = []
+        if users:
+            scores = self.score(affinity)
+            top = min(TECHNOLOGIES_PER_USER, len(technologies))
+            # Unordered top columns per user, then ordered by score
+            best = np.argpartition(-scores, top - 1, axis=1)[:, :top]
+            best = np.take_along_axis(
+                best,
+                np.argsort(-np.take_along_axis(scores, best, axis=1), axis=1),
+                axis=1,
+            )
+
+            candidates = self._candidates(db, technologies)
+            attempted = self._attempted(
+                db, [quiz[0] for quizzes in candidates.values() for quiz in quizzes]
+            )
+            for i, user_id in enumerate(users):
+                picks = self._pick(
+                    [technologies[j] for j in best[i]],
+                    scores[i, best[i]],
+                    candidates,
+                    attempted.get(user_id, set()),
+                )
+                if picks:
+                    entries.append(
+                        {
+                            "user_id": user_id,
+                            "payload": json.dumps(picks, separators=(",", ":")),
+                        }
+                    )
+
+        db.execute(delete(UserRecommendation))
+        for start in range(0, len(entries), INSERT_BATCH_SIZE):
+            db.execute(
+                insert(UserRecommendation), entries[start : start + INSERT_BATCH_SIZE]
+            )
+        db.commit()
+
+        self.last_build = {
+            "built_at": time.time(),
+            "users": len(users),
+            "technologies": len(technologies),
+            "stored": len(entries),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        logger.info(f"Recommendations rebuilt: {self.last_build}")
+        return len(entries)
+
+    @staticmethod
+    def _pick(
+        technologies: List[str],
+        weights: np.ndarray,
+        candidates: Dict[str, List],
+        attempted: Set[int],
+    ) -> List:
+        """Split STORED_RECOMMENDATIONS across technologies by score."""
+        total = float(weights.clip(min=0).sum())
+        if total <= 0:
+            return []
+        picks = []
+        for technology, weight in zip(technologies, weights):
+            quota = int(np.ceil(STORED_RECOMMENDATIONS * max(weight, 0.0) / total))
+            for quiz in candidates.get(technology, ()):
+                if quota <= 0 or len(picks) >= STORED_RECOMMENDATIONS:
+                    break
+                if quiz[0] in attempted:
+                    continue
+                picks.append(quiz)
+                quota -= 1
+        return picks
+
+
+recommendation_engine = RecommendationEngine(settings.RECOMMENDATION_HALF_LIFE_DAYS)
+
+
+def rebuild_recommendations() -> Optional[int]:
+    """Run ``recommendation_engine.build`` with a session of its own."""
+    db = SessionLocal()
+    try:
+        return recommendation_engine.build(db)
+    finally:
+        db.close()
@@ -1,43 +1,101 @@
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
 
 from app.models.user import User
 from app.schemas.user import UserCreate
-from app.utils.security import get_password_hash, verify_password
+from app.utils.principals import Principal, principal_cache
+from app.utils.password_hasher import password_hasher
 
 
 class UserService:
     def get_user_by_username(self, db: Session, username: str) -> User | None:
         return db.query(User).filter(User.username == username).first()
 
+    def get_user_by_id(self, db: Session, user_id: int) -> User | None:
+        return db.query(User).filter(User.id == user_id).first()
+
     def get_user_by_email(self, db: Session, email: str) -> User | None:
         return db.query(User).filter(User.email == email).first()
 
-    def create_user(self, db: Session, user: UserCreate) -> User:
-        if self.get_user_by_username(db, user.username):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already registered"
-            )
+    async def create_user(self, db: Session, user: UserCreate) -> User:
+        await run_in_threadpool(self._check_available, db, user)
+        hashed_password = await password_hasher.hash(user.password)
+        return await run_in_threadpool(self._insert_user, db, user, hashed_password)
 
-        if self.get_user_by_email(db, user.email):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
+    def _check_available(self, db: Session, user: UserCreate):
+        try:
+            if self.get_user_by_username(db, user.username):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Username already registered"
+                )
+
+            if self.get_user_by_email(db, user.email):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Email already registered"
+                )
+        finally:
+            # Give the connection back while the password is being hashed
+            db.rollback()
 
+    def _insert_user(self, db: Session, user: UserCreate, hashed_password: str) -> User:
         db_user = User(
             username=user.username,
             email=user.email,
-            hashed_password=get_password_hash(user.password)
+            hashed_password=hashed_password
         )
         db.add(db_user)
         db.commit()
         db.refresh(db_user)
         return db_user
 
-    def authenticate_user(self, db: Session, username: str, password: str) -> User | None:
-        user = self.get_user_by_username(db, username)
-        if not user or not verify_password(password, user.hashed_password):
+    async def authenticate_user(
+        self, db: Session, username: str, password: str
+    ) -> Principal | None:
+        row = await run_in_threadpool(self._get_credentials, db, username)
+        if not row or not row.is_active:
             return None
+        valid, new_hash = await password_hasher.verify(password, row.hashed_password)
+        if not valid:
+            return None
+        if new_hash:
+            # The bcrypt cost changed since this hash was made
+            await run_in_threadpool(self._update_password_hash, db, row.id, new_hash)
+        return Principal(id=row.id, username=row.username, is_active=True)
+
+    def _get_credentials(self, db: Session, username: str):
+        try:
+            return (
+                db.query(User.id, User.username, User.hashed_password, User.is_active)
+                .filter(User.username == username)
+                .first()
+            )
+        finally:
+            # Give the connection back while the password is being checked
+            db.rollback()
+
+    def _update_password_hash(self, db: Session, user_id: int, hashed_password: str):
+        db.execute(
+            update(User).where(User.id == user_id).values(hashed_password=hashed_password)
+        )
+        db.commit()
+
+    def set_active(self, db: Session, user_id: int, is_active: bool) -> User:
+        user = self.get_user_by_id(db, user_id)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        user.is_active = is_active
+        db.commit()
+        # Tokens carry the active flag, so refuse a deactivated user's
+        # outstanding tokens here instead of waiting for their claims to age
+        if is_active:
+            principal_cache.invalidate(user_id)
+        else:
+            principal_cache.revoke(user_id)
         return user
@@ -1,22 +1,58 @@
+import time
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
 
-from app.utils.security import decode_token
-from app.models.database import get_db
+from app.utils.principals import Principal, principal_cache
+from app.utils.security import decode_token_claims
+from app.models.database import SessionLocal
 from app.models.user import User
+from config import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    username = decode_token(token)
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
+def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
+    """
+    Resolve the caller from the token alone while its claims are younger
+    than ``PRINCIPAL_CLAIMS_TTL_SECONDS``; older tokens are checked against
+    the database, through ``principal_cache``.
+    """
+    claims = decode_token_claims(token)
+    user_id = claims.get("uid")
+
+    if user_id is None:
+        # Tokens issued before the user id was added to the claims
+        principal = _load_principal(User.username == claims["sub"])
+    elif principal_cache.is_revoked(user_id):
+        principal = None
+    elif time.time() - claims.get("iat", 0) < settings.PRINCIPAL_CLAIMS_TTL_SECONDS:
+        principal = Principal(
+            id=user_id,
+            username=claims["sub"],
+            is_active=claims.get("active", True),
+        )
+    else:
+        principal = principal_cache.get(user_id) or _load_principal(User.id == user_id)
+
+    if principal is None or not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Inactive user",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal
+
+def _load_principal(condition) -> Principal:
+    db = SessionLocal()
+    try:
+        row = db.query(User.id, User.username, User.is_active).filter(condition).first()
+    finally:
+        db.close()
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return user
+    principal = Principal(id=row.id, username=row.username, is_active=bool(row.is_active))
+    principal_cache.put(principal)
+    return principal
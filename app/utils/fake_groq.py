@@ -0,0 +1,232 @@
+"""
+Local stand-in for the Groq chat completions API.
+
+Returns schema-valid quiz JSON for the prompts built by ``GroqClient`` with a
+configurable latency distribution and failure mix, so the generation and
+retry pipeline can be load-tested without a live key.
+
+In-process::
+
+    fake = FakeGroq(FakeGroqConfig(median_latency_ms=800, rate_limit_rate=0.05))
+    client = GroqClient(http_client=fake.http_client())
+
+As an HTTP server (then set ``GROQ_BASE_URL=http://127.0.0.1:8787``)::
+
+    python -m app.utils.fake_groq --port 8787 --median-latency-ms 800
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Match the prompts built by GroqClient._build_full_prompt / _build_batch_prompt
+FULL_PROMPT = re.compile(
+    r"Generate an? (\w+) difficulty quiz about (.+?) with EXACTLY (\d+)"
+)
+BATCH_PROMPT = re.compile(
+    r"Generate EXACTLY (\d+) (\w+)-level multiple-choice questions about (.+)\.$",
+    re.MULTILINE,
+)
+
+
+@dataclass
+class FakeGroqConfig:
+    median_latency_ms: float = 500.0
+    # Spread of the log-normal latency; 0 gives a constant latency.
+    latency_sigma: float = 0.5
+    malformed_json_rate: float = 0.0
+    wrong_count_rate: float = 0.0
+    # Options labeled 1-4 instead of A-D
+    mislabeled_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after_seconds: float = 1.0
+    seed: Optional[int] = None
+    # Streamed responses are sent in pieces of this many characters
+    stream_chunk_chars: int = 40
+    # Share of the latency spent before the first streamed piece
+    time_to_first_token: float = 0.1
+
+
+class FakeGroq:
+    def __init__(self, config: Optional[FakeGroqConfig] = None):
+        self.config = config or FakeGroqConfig()
+        self.random = random.Random(self.config.seed)
+        self.stats: Counter = Counter()
+        self._ids = itertools.count(1)
+        self.app = FastAPI(title="Fake Groq")
+        self.app.post("/openai/v1/chat/completions")(self.chat_completions)
+        self.app.get("/stats")(self.get_stats)
+
+    def http_client(self, **kwargs) -> httpx.AsyncClient:
+        """AsyncClient that serves requests from this fake without a socket."""
+        kwargs.setdefault("timeout", httpx.Timeout(60.0))
+        return httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=self.app),
+            base_url="http://fake-groq",
+            **kwargs,
+        )
+
+    async def get_stats(self):
+        return dict(self.stats)
+
+    async def chat_completions(self, request: Request):
+        body = await request.json()
+        self.stats["requests"] += 1
+        latency = self._latency()
+        stream = bool(body.get("stream"))
+        await asyncio.sleep(latency * self.config.time_to_first_token if stream else latency)
+
+        if self.random.random() < self.config.rate_limit_rate:
+            self.stats["rate_limited"] += 1
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after": str(self.config.retry_after_seconds)},
+                content={
+                    "error": {
+                        "message": "Rate limit reached for model (fake)",
+                        "type": "tokens",
+                        "code": "rate_limit_exceeded",
+                    }
+                },
+            )
+
+        prompt = body["messages"][-1]["content"]
+        content = json.dumps(self._quiz_payload(prompt))
+        if self.random.random() < self.config.malformed_json_rate:
+            self.stats["malformed"] += 1
+            content = content[: self.random.randint(1, max(1, len(content) - 1))]
+
+        self.stats["ok"] += 1
+        if stream:
+            self.stats["streamed"] += 1
+            remaining = latency * (1 - self.config.time_to_first_token)
+            return StreamingResponse(
+                self._stream_chunks(body, content, remaining),
+                media_type="text/event-stream",
+            )
+        return {
+            "id": f"chatcmpl-fake-{next(self._ids)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": content},
+                }
+            ],
+            "usage": {
+                "prompt_tokens": len(prompt) // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": (len(prompt) + len(content)) // 4,
+            },
+        }
+
+    async def _stream_chunks(self, body: Dict[str, Any], content: str, duration: float):
+        size = max(1, int(self.config.stream_chunk_chars))
+        pieces = [content[i : i + size] for i in range(0, len(content), size)]
+        completion_id = f"chatcmpl-fake-{next(self._ids)}"
+        for i, piece in enumerate(pieces + [None]):
+            if piece is not None and i:
+                await asyncio.sleep(duration / len(pieces))
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "delta": {"content": piece} if piece is not None else {},
+                        "finish_reason": None if piece is not None else "stop",
+                    }
+                ],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    def _latency(self) -> float:
+        median = self.config.median_latency_ms / 1000
+        if median <= 0:
+            return 0
+        return self.random.lognormvariate(math.log(median), self.config.latency_sigma)
+
+    def _quiz_payload(self, prompt: str) -> Dict[str, Any]:
+        full = FULL_PROMPT.search(prompt)
+        batch = BATCH_PROMPT.search(prompt)
+        if full:
+            difficulty, technology, count = full.group(1), full.group(2), full.group(3)
+        elif batch:
+            count, difficulty, technology = batch.group(1), batch.group(2), batch.group(3)
+        else:
+            difficulty, technology, count = "medium", "Technology", "5"
+        count = int(count)
+
+        if self.random.random() < self.config.wrong_count_rate:
+            self.stats["wrong_count"] += 1
+            count = max(1, count + self.random.choice([-1, 1]))
+
+        labels = "ABCD"
+        if self.random.random() < self.config.mislabeled_rate:
+            self.stats["mislabeled"] += 1
+            labels = "1234"
+
+        return {
+            "title": f"{technology} {difficulty.capitalize()} Quiz",
+            "description": f"A {difficulty}-level quiz about {technology}",
+            "technology": technology,
+            "difficulty": difficulty,
+            "num_questions": count,
+            "questions": [self._question(technology, labels) for _ in range(count)],
+        }
+
+    def _question(self, technology: str, labels: str = "ABCD") -> Dict[str, Any]:
+        n = next(self._ids)
+        correct = self.random.randrange(4)
+        return {
+            "question_text": f"[{n}] Which statement about {technology} holds in case {n}?",
+            "explanation": f"Option {labels[correct]} is the only one that holds.",
+            "options": [
+                {
+                    "option_text": f"{label}) Statement {label} for case {n}",
+                    "is_correct": i == correct,
+                }
+                for i, label in enumerate(labels)
+            ],
+        }
+
+
+def main(argv: Optional[List[str]] = None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a fake Groq API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    for field in fields(FakeGroqConfig):
+        parser.add_argument(
+            "--" + field.name.replace("_", "-"),
+            type=int if field.name in ("seed", "stream_chunk_chars") else float,
+            default=field.default,
+        )
+    args = parser.parse_args(argv)
+
+    config = FakeGroqConfig(
+        **{f.name: getattr(args, f.name) for f in fields(FakeGroqConfig)}
+    )
+    uvicorn.run(FakeGroq(config).app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
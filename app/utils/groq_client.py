@@ -1,8 +1,14 @@
 import groq
 import json
 import asyncio
+import httpx
+from contextlib import aclosing
 from config import settings
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, AsyncIterator
+from app.utils.json_stream import QuestionStreamParser
+from app.utils.llm_cache import CacheMissError, get_completion_cache
+from app.utils.question_index import question_index
+from app.utils.rate_limit import TokenBucket
 from tenacity import (
     retry,
     stop_after_attempt,
@@ -11,13 +17,56 @@ from tenacity import (
 )
 
 
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Connection pool shared by every GroqClient in the process."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                settings.GROQ_READ_TIMEOUT_SECONDS,
+                connect=settings.GROQ_CONNECT_TIMEOUT_SECONDS,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.GROQ_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GROQ_MAX_CONNECTIONS,
+            ),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
 class GroqClient:
-    def __init__(self):
-        self.client = groq.Client(api_key=settings.GROQ_API_KEY)
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+    ):
+        # ``http_client`` lets tests and benchmarks route requests elsewhere,
+        # e.g. to the in-process fake in app.utils.fake_groq.
+        http_client = http_client or get_http_client()
+        self.client = groq.AsyncGroq(
+            api_key=settings.GROQ_API_KEY,
+            base_url=settings.GROQ_BASE_URL,
+            http_client=http_client,
+            timeout=http_client.timeout,
+        )
         self.primary_model = "llama3-70b-8192"
         self.fallback_model = "llama3-8b-8192"
         self.semaphore = asyncio.Semaphore(3)
         self.max_attempts = 3
+        self.cache = get_completion_cache()
+        # Only set for background generation, so user requests never queue
+        # behind the scheduler's quota.
+        self.rate_limiter = rate_limiter
 
     @retry(
         stop=stop_after_attempt(3),
@@ -25,89 +74,269 @@ class GroqClient:
         retry=retry_if_exception_type((ValueError, json.JSONDecodeError)),
     )
     async def generate_quiz(
-        self, technology: str, difficulty: str, num_questions: int
+        self,
+        technology: str,
+        difficulty: str,
+        num_questions: int,
+        progress: Optional[Callable[[int], None]] = None,
     ) -> Optional[Dict[str, Any]]:
         """
-        Generate a quiz with guaranteed exact question count using a multi-stage approach
+        Generate a quiz with guaranteed exact question count using a multi-stage approach.
+        ``progress`` is called with the number of questions generated so far.
+
+        Questions from a streamed full-quiz completion are kept as they
+        arrive, so one bad question no longer discards the others; only the
+        shortfall is regenerated in batches.
+        """
+        questions = []
+        async with aclosing(
+            self.stream_quiz(technology, difficulty, num_questions, progress)
+        ) as stream:
+            async for question in stream:
+                questions.append(question)
+
+        return self._format_final_quiz(
+            technology=technology,
+            difficulty=difficulty,
+            num_questions=num_questions,
+            questions=questions[:num_questions],
+        )
+
+    async def stream_quiz(
+        self,
+        technology: str,
+        difficulty: str,
+        num_questions: int,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield validated questions as soon as each one is complete, from a
+        streamed full-quiz completion. If the stream ends short or is
+        aborted as malformed, the missing questions are topped up with batch
+        generation.
         """
+        seen = set()
+        count = 0
+
         try:
-            full_quiz = await self._attempt_full_generation(
-                technology, difficulty, num_questions, self.primary_model
-            )
-            if full_quiz and len(full_quiz.get("questions", [])) == num_questions:
-                return full_quiz
+            async with aclosing(
+                self._stream_full_generation(technology, difficulty, num_questions)
+            ) as stream:
+                async for question in stream:
+                    if not self._accept(technology, question, seen):
+                        continue
+                    count += 1
+                    if progress:
+                        progress(count)
+                    yield question
+                    if count >= num_questions:
+                        return
+        except CacheMissError:
+            raise
         except Exception as e:
-            print(
-                f"Full generation failed: {str(e)[:200]}"
-            )  
+            print(f"Streaming generation failed: {str(e)[:200]}")
+
+        streamed = count
+        missing = num_questions - streamed
+        print(f"Streamed {streamed}/{num_questions} questions, topping up {missing}")
+        for question in await self._generate_batches_concurrently(
+            technology,
+            difficulty,
+            missing,
+            (lambda generated: progress(streamed + generated)) if progress else None,
+            seen=seen,
+        ):
+            yield question
+
+    async def _stream_full_generation(
+        self, technology: str, difficulty: str, num_questions: int
+    ) -> AsyncIterator[Dict[str, Any]]:
+        # Groq's JSON mode cannot be combined with streaming, so the prompt
+        # alone asks for JSON and every question is validated on arrival.
+        prompt = self._build_full_prompt(technology, difficulty, num_questions)
+        request = dict(
+            messages=[
+                {
+                    "role": "user",
+                    "content": prompt
+                    + "\n\nIMPORTANT: Return ONLY the JSON object, without any other text.",
+                }
+            ],
+            model=self.primary_model,
+            temperature=0.4,
+        )
+        parser = QuestionStreamParser()
+        valid = 0
+
+        if self.cache:
+            cached = self.cache.get(self.cache.make_key(request))
+            if cached is not None:
+                for question in parser.feed(cached):
+                    if self._validate_question(question):
+                        yield question
+                return
+            if self.cache.replay_only:
+                raise CacheMissError(f"No recorded stream for {request['model']}")
+
+        if self.rate_limiter:
+            await self.rate_limiter.acquire()
+        # The semaphore is held per network read, never across a yield, so a
+        # slow consumer of the stream cannot starve other generation
+        deadline = asyncio.get_running_loop().time() + settings.GROQ_CALL_TIMEOUT_SECONDS
+        async with self.semaphore:
+            stream = await asyncio.wait_for(
+                self.client.chat.completions.create(**request, stream=True),
+                timeout=settings.GROQ_CALL_TIMEOUT_SECONDS,
+            )
+        try:
+            while True:
+                remaining = deadline - asyncio.get_running_loop().time()
+                async with self.semaphore:
+                    try:
+                        chunk = await asyncio.wait_for(stream.__anext__(), remaining)
+                    except StopAsyncIteration:
+                        break
+                if not chunk.choices:
+                    continue
+                for question in parser.feed(chunk.choices[0].delta.content or ""):
+                    if self._validate_question(question):
+                        valid += 1
+                        yield question
+                    else:
+                        print(
+                            f"Discarded invalid question: {str(question.get('question_text', 'Unknown'))[:50]}..."
+                        )
+        finally:
+            await stream.close()
+
+        if valid == num_questions:
+            self._remember(request, parser.text)
 
-        print("Falling back to batch generation...")
+    async def _generate_batches_concurrently(
+        self,
+        technology: str,
+        difficulty: str,
+        num_questions: int,
+        progress: Optional[Callable[[int], None]] = None,
+        seen: Optional[set] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Request every missing batch at once (the semaphore bounds how many are
+        in flight), merge and dedupe the results, then top up only the
+        shortfall for at most ``max_attempts`` rounds. ``seen`` holds the
+        questions already accepted elsewhere in the same quiz.
+        """
         batch_size = min(5, max(2, num_questions // 3))
-        questions = []
+        questions: List[Dict[str, Any]] = []
+        seen = set() if seen is None else seen
+        last_error: Optional[Exception] = None
+        variant = 0
 
-        while len(questions) < num_questions:
-            try:
+        for _ in range(self.max_attempts):
+            needed = num_questions - len(questions)
+            if needed <= 0:
+                break
+
+            sizes = [batch_size] * (needed // batch_size)
+            if needed % batch_size:
+                sizes.append(needed % batch_size)
+
+            arrived = 0
+
+            async def run_batch(i: int, size: int) -> List[Dict[str, Any]]:
+                nonlocal arrived
                 batch = await self._generate_question_batch(
                     technology=technology,
                     difficulty=difficulty,
-                    batch_size=min(batch_size, num_questions - len(questions)),
-                    model_choice=(
-                        "primary" if len(questions) < num_questions / 2 else "fallback"
-                    ),
+                    batch_size=size,
+                    # Spread the load across both models' rate limits
+                    model_choice="primary" if i < len(sizes) / 2 else "fallback",
+                    variant=variant + i,
                 )
-                questions.extend(batch)
-                print(
-                    f"Generated {len(batch)} questions (Total: {len(questions)}/{num_questions})"
-                )
-            except Exception as e:
-                print(f"Batch generation error: {str(e)[:200]}")
-                if len(questions) >= max(
-                    3, num_questions * 0.7
-                ):  
-                    break
-                if "rate limit" in str(e).lower():
-                    await asyncio.sleep(5) 
-                raise
-
-        return self._format_final_quiz(
-            technology=technology,
-            difficulty=difficulty,
-            num_questions=num_questions,
-            questions=questions[:num_questions], 
-        )
+                arrived += len(batch)
+                if progress:
+                    progress(min(num_questions, len(questions) + arrived))
+                return batch
+
+            results = await asyncio.gather(
+                *[run_batch(i, size) for i, size in enumerate(sizes)],
+                return_exceptions=True,
+            )
+            variant += len(sizes)
+
+            rate_limited = False
+            for result in results:
+                if isinstance(result, CacheMissError):
+                    raise result
+                if isinstance(result, Exception):
+                    print(f"Batch generation error: {str(result)[:200]}")
+                    last_error = result
+                    rate_limited = rate_limited or "rate limit" in str(result).lower()
+                    continue
+                for q in result:
+                    if self._accept(technology, q, seen):
+                        questions.append(q)
+
+            print(f"Generated {len(questions)}/{num_questions} questions")
+            if rate_limited and len(questions) < num_questions:
+                await asyncio.sleep(5)
+
+        if len(questions) < num_questions and len(questions) < max(
+            3, num_questions * 0.7
+        ):
+            raise last_error or ValueError(
+                f"Batch generation produced only {len(questions)}/{num_questions} questions"
+            )
+        return questions
 
-    async def _attempt_full_generation(
-        self, technology: str, difficulty: str, num_questions: int, model: str
-    ) -> Optional[Dict[str, Any]]:
-        """Attempt to generate all questions at once with strict validation"""
-        prompt = self._build_full_prompt(technology, difficulty, num_questions)
+    def _accept(self, technology: str, question: Dict[str, Any], seen: set) -> bool:
+        """
+        Reject exact repeats within the quiz and near-duplicates of questions
+        already stored for the technology.
+        """
+        key = " ".join(question["question_text"].lower().split())
+        if key in seen:
+            return False
+        duplicate = question_index.find_duplicate(technology, question["question_text"])
+        if duplicate:
+            print(
+                f"Discarded near-duplicate of question {duplicate[0]} "
+                f"({duplicate[1]:.0%}): {question['question_text'][:50]}..."
+            )
+            return False
+        seen.add(key)
+        return True
 
-        async with self.semaphore:
-            try:
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(
-                    None,
-                    lambda: self.client.chat.completions.create(
-                        messages=[
-                            {
-                                "role": "user",
-                                "content": prompt
-                                + "\n\nIMPORTANT: Return the response as valid JSON.",
-                            }
-                        ],
-                        model=model,
-                        response_format={"type": "json_object"},
-                        temperature=0.4,
-                    ),
+    async def _create_completion(self, request: Dict[str, Any], variant: int = 0) -> str:
+        """
+        Return the completion text for ``request``, from the completion cache
+        when enabled. The overall deadline cancels the underlying HTTP request
+        instead of leaving it running in a thread.
+        """
+        if self.cache:
+            cached = self.cache.get(self.cache.make_key(request, variant))
+            if cached is not None:
+                return cached
+            if self.cache.replay_only:
+                raise CacheMissError(
+                    f"No recorded completion for {request['model']} (variant {variant})"
                 )
 
-                quiz_data = json.loads(response.choices[0].message.content)
-                if self._validate_quiz_strict(quiz_data, num_questions, difficulty):
-                    return quiz_data
-                raise ValueError("Full generation validation failed")
-            except Exception as e:
-                print(f"Full generation attempt failed: {str(e)[:200]}")
-                raise
+        if self.rate_limiter:
+            await self.rate_limiter.acquire()
+        response = await asyncio.wait_for(
+            self.client.chat.completions.create(**request),
+            timeout=settings.GROQ_CALL_TIMEOUT_SECONDS,
+        )
+        return response.choices[0].message.content
+
+    def _remember(self, request: Dict[str, Any], content: str, variant: int = 0):
+        # Only validated completions are stored, so a bad response is never
+        # replayed into every retry.
+        if self.cache and not self.cache.replay_only:
+            self.cache.put(
+                self.cache.make_key(request, variant), request["model"], content
+            )
 
     async def _generate_question_batch(
         self,
@@ -115,32 +344,30 @@ class GroqClient:
         difficulty: str,
         batch_size: int,
         model_choice: str = "primary",
+        variant: int = 0,
     ) -> List[Dict[str, Any]]:
         """Generate a batch of questions with strict validation"""
         model = self.primary_model if model_choice == "primary" else self.fallback_model
         prompt = self._build_batch_prompt(technology, difficulty, batch_size)
 
+        request = dict(
+            messages=[
+                {
+                    "role": "user",
+                    "content": prompt + "\n\nReturn the response as valid JSON.",
+                }
+            ],
+            model=model,
+            response_format={"type": "json_object"},
+            temperature=0.3,
+        )
+
         async with self.semaphore:
             try:
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(
-                    None,
-                    lambda: self.client.chat.completions.create(
-                        messages=[
-                            {
-                                "role": "user",
-                                "content": prompt
-                                + "\n\nReturn the response as valid JSON.",
-                            }
-                        ],
-                        model=model,
-                        response_format={"type": "json_object"},
-                        temperature=0.3,
-                    ),
-                )
+                content = await self._create_completion(request, variant)
 
-                data = json.loads(response.choices[0].message.content)
-                questions = data.get("questions", [])
+                # Complete questions before a truncated or broken tail are kept
+                questions = QuestionStreamParser().feed(content)
 
                 # Strict validation of each question
                 valid_questions = []
@@ -155,7 +382,9 @@ class GroqClient:
                 if not valid_questions:
                     raise ValueError("No valid questions generated in batch")
 
-                return valid_questions[:batch_size] 
+                if len(valid_questions) >= batch_size:
+                    self._remember(request, content, variant)
+                return valid_questions[:batch_size]
             except Exception as e:
                 print(f"Batch generation failed: {str(e)[:200]}")
                 raise
@@ -298,29 +527,6 @@ class GroqClient:
         - MUST generate EXACTLY {batch_size} questions
         """
 
-    def _validate_quiz_strict(
-        self,
-        quiz_data: Dict[str, Any],
-        expected_questions: int,
-        expected_difficulty: str,
-    ) -> bool:
-        """Strict validation for full quiz"""
-        if not quiz_data:
-            return False
-
-        questions = quiz_data.get("questions", [])
-        if len(questions) != expected_questions:
-            print(
-                f"Question count mismatch: expected {expected_questions}, got {len(questions)}"
-            )
-            return False
-
-        for q in questions:
-            if not self._validate_question(q):
-                return False
-
-        return True
-
     def _validate_question(self, question: Dict[str, Any]) -> bool:
         """Validate individual question"""
         try:
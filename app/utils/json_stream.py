@@ -0,0 +1,156 @@
+import json
+from typing import Any, Dict, List, Optional
+
+OPTION_LABELS = "ABCD"
+
+
+class MalformedStreamError(ValueError):
+    """The output received so far can no longer become a usable quiz."""
+
+
+class QuestionStreamParser:
+    """
+    Pulls complete question objects out of a quiz JSON document while it is
+    still being received.
+
+    ``feed`` takes the next chunk of text and returns the entries of the
+    top-level ``"questions"`` array whose closing brace arrived in it. The
+    scanner only tracks strings, nesting and the current object key, so the
+    cost of each chunk is linear in its length.
+
+    Output that is structurally wrong raises ``MalformedStreamError`` as soon
+    as it is seen, so the caller can cancel the completion instead of paying
+    for the rest of it: no JSON object, a ``questions`` value that is not an
+    array, no ``questions`` array within ``max_chars_before_questions``, or
+    options that are not labeled A-D in order. A question that is merely
+    incomplete or invalid is still returned; deciding whether to keep it is
+    up to the caller.
+    """
+
+    def __init__(
+        self, max_preamble_chars: int = 200, max_chars_before_questions: int = 2000
+    ):
+        self.max_preamble_chars = max_preamble_chars
+        self.max_chars_before_questions = max_chars_before_questions
+        self.text = ""
+        self._pos = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        # One entry per open container:
+        # [kind, current key, expecting key, name in parent, children, start]
+        self._stack: List[List[Any]] = []
+        self._root_seen = False
+        self._questions_seen = False
+        self._awaiting_questions = False
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        self.text += chunk
+        completed = []
+        text = self.text
+
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._end_string(text[self._string_start : i + 1])
+                continue
+
+            if not self._root_seen:
+                if char == "{":
+                    self._root_seen = True
+                elif char == "[":
+                    raise MalformedStreamError("Expected a JSON object, got an array")
+                elif i >= self.max_preamble_chars:
+                    raise MalformedStreamError("No JSON object in the response")
+                else:
+                    continue
+
+            if self._awaiting_questions and not char.isspace():
+                if char != "[":
+                    raise MalformedStreamError('"questions" is not an array')
+                self._awaiting_questions = False
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char in "{[":
+                self._open(char, i)
+            elif char in "}]":
+                question = self._close(i)
+                if question is not None:
+                    completed.append(question)
+            elif char == ":" and self._stack and self._stack[-1][0] == "{":
+                self._stack[-1][2] = False
+                if len(self._stack) == 1 and self._stack[0][1] == "questions":
+                    self._awaiting_questions = True
+            elif char == "," and self._stack and self._stack[-1][0] == "{":
+                self._stack[-1][2] = True
+
+        self._pos = len(text)
+        if not self._questions_seen and len(text) > self.max_chars_before_questions:
+            raise MalformedStreamError("No questions array in the response")
+        return completed
+
+    def _end_string(self, literal: str):
+        top = self._stack[-1] if self._stack else None
+        if top and top[0] == "{" and top[2]:
+            try:
+                top[1] = json.loads(literal)
+            except ValueError:
+                top[1] = None
+
+    def _open(self, char: str, index: int):
+        parent = self._stack[-1] if self._stack else None
+        if parent is None:
+            name = None
+        elif parent[0] == "{":
+            name = parent[1]
+        else:
+            name = parent[4]
+            parent[4] += 1
+        if char == "[" and len(self._stack) == 1 and name == "questions":
+            self._questions_seen = True
+        self._stack.append([char, None, char == "{", name, 0, index])
+
+    def _path(self) -> tuple:
+        return tuple(entry[3] for entry in self._stack[1:])
+
+    def _close(self, index: int) -> Optional[Dict[str, Any]]:
+        if not self._stack:
+            return None
+        path = self._path()
+        kind, _, _, _, _, start = self._stack.pop()
+
+        if not self._stack and not self._questions_seen:
+            raise MalformedStreamError("No questions array in the response")
+        if kind != "{":
+            return None
+
+        # ("questions", i) is a question, ("questions", i, "options", j) an option
+        if len(path) == 4 and path[0] == "questions" and path[2] == "options":
+            self._check_option(self.text[start : index + 1], path[3])
+        elif len(path) == 2 and path[0] == "questions":
+            try:
+                return json.loads(self.text[start : index + 1])
+            except ValueError:
+                return None
+        return None
+
+    def _check_option(self, literal: str, position: int):
+        if position >= len(OPTION_LABELS):
+            raise MalformedStreamError("Question has more than four options")
+        try:
+            option_text = json.loads(literal).get("option_text", "")
+        except (ValueError, AttributeError):
+            raise MalformedStreamError("Option is not a JSON object")
+        label = OPTION_LABELS[position]
+        if not str(option_text).lstrip().startswith(label):
+            raise MalformedStreamError(
+                f"Option {position + 1} is not labeled {label}: {str(option_text)[:30]!r}"
+            )
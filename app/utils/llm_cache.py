@@ -0,0 +1,138 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config import settings
+
+CACHE_MODES = ("off", "readwrite", "replay")
+
+
+class CacheMissError(RuntimeError):
+    """Raised in replay mode when a request has no recorded response."""
+
+
+class CompletionCache:
+    """
+    Content-addressed store of LLM completions in a local SQLite file.
+
+    Keys hash the request (model, messages, temperature, response_format)
+    plus a ``variant`` number, so several identical prompts sent on purpose
+    within one generation (e.g. parallel batches) are recorded separately
+    and replayed in the same order. Least recently used entries are evicted
+    once the stored responses exceed ``max_bytes``.
+    """
+
+    def __init__(self, path: str, max_bytes: int, replay_only: bool = False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.replay_only = replay_only
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT,"
+            " response TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_completions_last_used"
+            " ON completions (last_used)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(request: Dict[str, Any], variant: int = 0) -> str:
+        material = {
+            "model": request.get("model"),
+            "messages": request.get("messages"),
+            "temperature": request.get("temperature"),
+            "response_format": request.get("response_format"),
+            "variant": variant,
+        }
+        raw = json.dumps(material, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE completions SET last_used = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        now = time.time()
+        size = len(response.encode())
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions"
+                " (key, model, response, size, created_at, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM completions"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM completions ORDER BY last_used"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            total -= size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions"
+            ).fetchone()
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "replay_only": self.replay_only,
+        }
+
+
+_cache: Optional[CompletionCache] = None
+
+
+def get_completion_cache() -> Optional[CompletionCache]:
+    """Process-wide cache configured by ``LLM_CACHE_MODE``, or None when off."""
+    global _cache
+    mode = settings.LLM_CACHE_MODE
+    if mode not in CACHE_MODES:
+        raise ValueError(f"LLM_CACHE_MODE must be one of {CACHE_MODES}, got {mode!r}")
+    if mode == "off":
+        return None
+    if _cache is None:
+        _cache = CompletionCache(
+            settings.LLM_CACHE_PATH,
+            settings.LLM_CACHE_MAX_BYTES,
+            replay_only=mode == "replay",
+        )
+    return _cache
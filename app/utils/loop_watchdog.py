@@ -0,0 +1,148 @@
+import asyncio
+import bisect
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the lag histogram buckets; the last bucket is open
+LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+STACK_DEPTH = 20
+
+
+class LoopWatchdog:
+    """
+    Measures event-loop scheduling lag and catches the code that causes it.
+
+    A task on the loop sleeps ``interval`` seconds at a time and records how
+    late it wakes up in a histogram. A daemon thread checks that the task
+    keeps beating; when it has been silent for longer than ``threshold``
+    past its interval, the loop is blocked, and the thread logs the
+    loop thread's current stack, which is the blocking call. Costs one
+    short sleep per interval on the loop and one thread wake-up per
+    interval.
+    """
+
+    def __init__(self, interval: float, threshold: float, max_stalls: int = 20):
+        self.interval = interval
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._stalls: deque = deque(maxlen=max_stalls)
+        self._stopped = threading.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._pending_stall: Optional[Dict[str, Any]] = None
+        self._counts = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.stall_count = 0
+
+    def start(self) -> None:
+        """Start watching the running loop. Call from the loop's thread."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._beat())
+        self._thread = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 2)
+            self._thread = None
+
+    async def _beat(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self._record(max(0.0, time.perf_counter() - start - self.interval))
+            self._last_beat = time.monotonic()
+
+    def _record(self, lag: float):
+        lag_ms = lag * 1000
+        with self._lock:
+            self._counts[bisect.bisect_left(LAG_BUCKETS_MS, lag_ms)] += 1
+            self.samples += 1
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+            if self._pending_stall is not None:
+                # The stall is over; its full length is the lag just measured
+                self._pending_stall["lag_ms"] = round(lag_ms, 1)
+                self._pending_stall = None
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval):
+            blocked = time.monotonic() - self._last_beat - self.interval
+            if blocked <= self.threshold:
+                continue
+            with self._lock:
+                if self._pending_stall is not None:
+                    continue
+            # The stack names source paths, so it goes to the log only
+            stack = self._loop_stack()
+            stall = {
+                "detected_at": time.time(),
+                "blocked_ms_at_capture": round(blocked * 1000, 1),
+                "lag_ms": None,
+            }
+            with self._lock:
+                self._pending_stall = stall
+                self._stalls.append(stall)
+                self.stall_count += 1
+            logger.warning(
+                f"Event loop blocked for {blocked * 1000:.0f}ms at:\n"
+                + "\n".join(stack)
+            )
+
+    def _loop_stack(self) -> List[str]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return []
+        return [
+            f"{entry.filename}:{entry.lineno} in {entry.name}"
+            for entry in traceback.extract_stack(frame)[-STACK_DEPTH:]
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            bounds = [f"<={bound}ms" for bound in LAG_BUCKETS_MS] + [
+                f">{LAG_BUCKETS_MS[-1]}ms"
+            ]
+            return {
+                "running": self._task is not None,
+                "interval_ms": self.interval * 1000,
+                "threshold_ms": self.threshold * 1000,
+                "samples": self.samples,
+                "mean_lag_ms": round(self.total_lag / self.samples * 1000, 3)
+                if self.samples
+                else 0.0,
+                "max_lag_ms": round(self.max_lag * 1000, 3),
+                "histogram": dict(zip(bounds, self._counts)),
+                "stalls": self.stall_count,
+                "recent_stalls": list(self._stalls),
+            }
+
+
+loop_watchdog = LoopWatchdog(
+    settings.LOOP_WATCHDOG_INTERVAL_MS / 1000,
+    settings.LOOP_WATCHDOG_THRESHOLD_MS / 1000,
+)
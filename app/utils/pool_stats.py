@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMonitor:
+    """
+    Connection pool metrics: how long checkouts waited for a connection,
+    how many timed out, and the peak number of connections checked out and
+    of overflow connections in use.
+    """
+
+    def __init__(self, samples: int = 1000):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=samples)
+        self.pool = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._waits.clear()
+            self.checkouts = 0
+            self.timeouts = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+            self.peak_checked_out = 0
+            self.peak_overflow = 0
+
+    def attach(self, pool) -> None:
+        self.pool = pool
+        event.listen(pool, "checkout", self._on_checkout)
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self._waits.append(seconds)
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        pool = self.pool
+        with self._lock:
+            self.checkouts += 1
+            if isinstance(pool, QueuePool):
+                self.peak_checked_out = max(self.peak_checked_out, pool.checkedout())
+                self.peak_overflow = max(self.peak_overflow, max(0, pool.overflow()))
+
+    def stats(self) -> Dict[str, Any]:
+        pool = self.pool
+        with self._lock:
+            waits = sorted(self._waits)
+            current: Dict[str, Any] = {"pool_class": type(pool).__name__}
+            if isinstance(pool, QueuePool):
+                current.update(
+                    size=pool.size(),
+                    checked_out=pool.checkedout(),
+                    checked_in=pool.checkedin(),
+                    overflow=max(0, pool.overflow()),
+                    max_overflow=pool._max_overflow,
+                    timeout_seconds=pool.timeout(),
+                )
+
+            def pct(p: float) -> float:
+                if not waits:
+                    return 0.0
+                return round(waits[min(len(waits) - 1, int(len(waits) * p))] * 1000, 3)
+
+            return {
+                **current,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "peak_checked_out": self.peak_checked_out,
+                "peak_overflow": self.peak_overflow,
+                "wait_ms": {
+                    "mean": round(self.total_wait / len(waits) * 1000, 3)
+                    if waits
+                    else 0.0,
+                    "p50": pct(0.50),
+                    "p95": pct(0.95),
+                    "p99": pct(0.99),
+                    "max": round(self.max_wait * 1000, 3),
+                    "samples": len(waits),
+                },
+            }
+
+
+# One per engine: the sync engine and the asyncio engine have separate pools
+pool_monitor = PoolMonitor()
+async_pool_monitor = PoolMonitor()
+
+
+class _TimedCheckout:
+    """Reports how long each checkout waited to the class's ``monitor``."""
+
+    monitor: PoolMonitor
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.monitor.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.monitor.record_wait(time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    monitor = pool_monitor
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    monitor = async_pool_monitor
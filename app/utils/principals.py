@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from config import settings
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller, as far as endpoints need to know it."""
+
+    id: int
+    username: str
+    is_active: bool = True
+
+
+class PrincipalCache:
+    """
+    Small LRU of principals loaded from the database for tokens whose claims
+    are too old to be trusted on their own, plus a record of users
+    deactivated in this process so their still-valid tokens are refused at
+    once instead of after ``ttl_seconds``.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, Tuple[float, Principal]]" = OrderedDict()
+        self._revoked: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or now - entry[0] >= self.ttl_seconds:
+                self._entries.pop(user_id, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, principal: Principal) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[principal.id] = (time.monotonic(), principal)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def is_revoked(self, user_id: int) -> bool:
+        with self._lock:
+            revoked_at = self._revoked.get(user_id)
+            if revoked_at is None:
+                return False
+            if time.monotonic() - revoked_at >= self.ttl_seconds:
+                # Past the claims TTL every token is checked against the
+                # database anyway
+                del self._revoked[user_id]
+                return False
+            return True
+
+    def revoke(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._revoked[user_id] = time.monotonic()
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._revoked.pop(user_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "revoked": len(self._revoked),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+principal_cache = PrincipalCache(
+    settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CLAIMS_TTL_SECONDS
+)
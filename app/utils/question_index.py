@@ -0,0 +1,263 @@
+"""
+Near-duplicate detection for generated questions.
+
+Each technology gets a MinHash/LSH index over the word 3-gram shingles of its
+stored question texts. A lookup hashes the new text once and only compares
+it with questions that share an LSH band, so the cost does not grow with
+the number of stored questions.
+
+Print the duplicate rate of the stored questions per technology with::
+
+    python -m app.utils.question_index
+"""
+import argparse
+import random
+import re
+import sys
+import threading
+import zlib
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from config import settings
+
+NUM_PERM = 64
+# 16 bands of 4 rows: pairs with a Jaccard similarity of 0.7 share a band
+# with ~99% probability, pairs below 0.3 rarely do.
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)
+]
+_TOKEN = re.compile(r"[a-z0-9_]+")
+
+Signature = Tuple[int, ...]
+
+
+def shingles(text: str) -> Set[int]:
+    tokens = _TOKEN.findall(text.lower())
+    if len(tokens) <= SHINGLE_SIZE:
+        grams = [" ".join(tokens)] if tokens else []
+    else:
+        grams = [
+            " ".join(tokens[i : i + SHINGLE_SIZE])
+            for i in range(len(tokens) - SHINGLE_SIZE + 1)
+        ]
+    return {zlib.crc32(gram.encode()) for gram in grams}
+
+
+def signature(text: str) -> Optional[Signature]:
+    hashes = shingles(text)
+    if not hashes:
+        return None
+    return tuple(
+        min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS
+    )
+
+
+def similarity(left: Signature, right: Signature) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return sum(x == y for x, y in zip(left, right)) / NUM_PERM
+
+
+class _TechnologyIndex:
+    def __init__(self):
+        self.signatures: Dict[int, Signature] = {}
+        self.bands: List[Dict[Signature, List[int]]] = [
+            defaultdict(list) for _ in range(BANDS)
+        ]
+
+    def add(self, question_id: int, sig: Signature):
+        if question_id in self.signatures:
+            return
+        self.signatures[question_id] = sig
+        for band, bucket in enumerate(self.bands):
+            bucket[sig[band * ROWS : (band + 1) * ROWS]].append(question_id)
+
+    def nearest(self, sig: Signature) -> Optional[Tuple[int, float]]:
+        candidates = set()
+        for band, bucket in enumerate(self.bands):
+            candidates.update(bucket.get(sig[band * ROWS : (band + 1) * ROWS], ()))
+        best = None
+        for question_id in candidates:
+            score = similarity(sig, self.signatures[question_id])
+            if best is None or score > best[1]:
+                best = (question_id, score)
+        return best
+
+
+class QuestionIndex:
+    """
+    Per-technology MinHash/LSH index of stored questions.
+
+    ``load`` fills it from the database (at startup, in a worker thread);
+    ``QuizWriter`` adds every question it stores. Until the first load has
+    finished, ``find_duplicate`` reports nothing, so generation is never
+    blocked on the index.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.ready = False
+        self._indexes: Dict[str, _TechnologyIndex] = defaultdict(_TechnologyIndex)
+        self._lock = threading.Lock()
+        self._loading = False
+        self._added_while_loading: List[Tuple[str, int, Signature]] = []
+        self.checked: Counter = Counter()
+        self.duplicates: Counter = Counter()
+        self.stored_duplicates: Counter = Counter()
+
+    @staticmethod
+    def _key(technology: str) -> str:
+        return technology.strip().lower()
+
+    def find_duplicate(
+        self, technology: str, question_text: str
+    ) -> Optional[Tuple[int, float]]:
+        """
+        Return ``(question_id, similarity)`` of a stored question of the same
+        technology that is at least ``threshold`` similar, else None.
+        """
+        if not self.ready:
+            return None
+        sig = signature(question_text)
+        if sig is None:
+            return None
+        key = self._key(technology)
+        with self._lock:
+            self.checked[key] += 1
+            index = self._indexes.get(key)
+            match = index.nearest(sig) if index else None
+            if match and match[1] >= self.threshold:
+                self.duplicates[key] += 1
+                return match
+        return None
+
+    def add(self, technology: str, question_id: int, question_text: str):
+        sig = signature(question_text)
+        if sig is None:
+            return
+        key = self._key(technology)
+        with self._lock:
+            self._indexes[key].add(question_id, sig)
+            if self._loading:
+                self._added_while_loading.append((key, question_id, sig))
+
+    def load(self, db: Session) -> int:
+        """
+        Rebuild the index from every stored question and count the stored
+        near-duplicates per technology along the way. Returns the number of
+        questions indexed.
+        """
+        from app.models.quiz import Question, Quiz
+
+        with self._lock:
+            self._loading = True
+            self._added_while_loading = []
+
+        indexes: Dict[str, _TechnologyIndex] = defaultdict(_TechnologyIndex)
+        stored_duplicates: Counter = Counter()
+        total = 0
+        rows = (
+            db.query(Question.id, Question.question_text, Quiz.technology)
+            .join(Quiz, Question.quiz_id == Quiz.id)
+            .order_by(Question.id)
+            .yield_per(1000)
+        )
+        try:
+            for question_id, text, technology in rows:
+                sig = signature(text or "")
+                if sig is None or not technology:
+                    continue
+                index = indexes[self._key(technology)]
+                match = index.nearest(sig)
+                if match and match[1] >= self.threshold:
+                    stored_duplicates[self._key(technology)] += 1
+                index.add(question_id, sig)
+                total += 1
+
+            with self._lock:
+                # Questions stored while the rows above were being read
+                for key, question_id, sig in self._added_while_loading:
+                    indexes[key].add(question_id, sig)
+                self._indexes = indexes
+                self.stored_duplicates = stored_duplicates
+                self.ready = True
+        finally:
+            with self._lock:
+                self._loading = False
+                self._added_while_loading = []
+        return total
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Per technology: stored questions and how many of them are
+        near-duplicates of an earlier one, plus generated questions checked
+        and rejected since startup.
+        """
+        with self._lock:
+            return {
+                key: {
+                    "indexed": len(index.signatures),
+                    "stored_duplicates": self.stored_duplicates[key],
+                    "stored_duplicate_rate": _rate(
+                        self.stored_duplicates[key], len(index.signatures)
+                    ),
+                    "checked": self.checked[key],
+                    "rejected": self.duplicates[key],
+                    "rejection_rate": _rate(self.duplicates[key], self.checked[key]),
+                }
+                for key, index in sorted(self._indexes.items())
+            }
+
+
+def _rate(part: int, whole: int) -> float:
+    return round(part / whole, 4) if whole else 0.0
+
+
+question_index = QuestionIndex(settings.DUPLICATE_QUESTION_THRESHOLD)
+
+
+def load_question_index() -> int:
+    """Fill ``question_index`` from the database with a session of its own."""
+    from app.models.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return question_index.load(db)
+    finally:
+        db.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Report near-duplicate questions")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=settings.DUPLICATE_QUESTION_THRESHOLD,
+        help="estimated Jaccard similarity at which two questions are duplicates",
+    )
+    args = parser.parse_args(argv)
+
+    question_index.threshold = args.threshold
+    total = load_question_index()
+    stats = question_index.stats()
+    print(f"{'technology':32} {'questions':>9} {'duplicates':>10} {'rate':>7}")
+    for technology, row in stats.items():
+        print(
+            f"{technology[:32]:32} {row['indexed']:9d} "
+            f"{row['stored_duplicates']:10d} {row['stored_duplicate_rate']:7.2%}"
+        )
+    duplicates = sum(row["stored_duplicates"] for row in stats.values())
+    print(f"{total} questions, {duplicates} near-duplicates")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
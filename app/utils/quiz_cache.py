@@ -0,0 +1,91 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from config import settings
+
+
+@dataclass(frozen=True)
+class CachedQuiz:
+    body: bytes
+    etag: str
+    is_public: bool
+    created_by: Optional[int]
+
+
+class QuizPayloadCache:
+    """
+    LRU of serialized ``QuizOut`` payloads keyed by quiz id, bounded by the
+    total size of the cached bodies rather than by entry count.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[int, CachedQuiz]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_etag(body: bytes) -> str:
+        return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    def get(self, quiz_id: int) -> Optional[CachedQuiz]:
+        with self._lock:
+            entry = self._entries.get(quiz_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(quiz_id)
+            self.hits += 1
+            return entry
+
+    def put(
+        self, quiz_id: int, body: bytes, is_public: bool, created_by: Optional[int]
+    ) -> CachedQuiz:
+        entry = CachedQuiz(
+            body=body,
+            etag=self.make_etag(body),
+            is_public=is_public,
+            created_by=created_by,
+        )
+        if len(body) > self.max_bytes:
+            return entry
+
+        with self._lock:
+            old = self._entries.pop(quiz_id, None)
+            if old is not None:
+                self._size -= len(old.body)
+            self._entries[quiz_id] = entry
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+        return entry
+
+    def invalidate(self, quiz_id: int) -> None:
+        with self._lock:
+            old = self._entries.pop(quiz_id, None)
+            if old is not None:
+                self._size -= len(old.body)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+quiz_payload_cache = QuizPayloadCache(settings.QUIZ_CACHE_MAX_BYTES)
@@ -0,0 +1,44 @@
+"""
+Recompute the ``user_scores`` leaderboard rollup from raw quiz attempts.
+
+    python -m app.utils.rebuild_leaderboard          # rebuild
+    python -m app.utils.rebuild_leaderboard --check  # report drift only
+"""
+import argparse
+import sys
+
+from app.models.database import SessionLocal
+from app.services.leaderboard_service import LeaderboardService
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="only compare the rollup with quiz_attempts; exit 1 on drift",
+    )
+    args = parser.parse_args(argv)
+
+    service = LeaderboardService()
+    db = SessionLocal()
+    try:
+        if args.check:
+            drift = service.find_drift(db)
+            for row in drift:
+                print(
+                    f"user {row['user_id']}: expected (score, attempts)="
+                    f"{row['expected']} actual={row['actual']}"
+                )
+            print(f"{len(drift)} user(s) out of sync")
+            return 1 if drift else 0
+
+        rows = service.rebuild(db)
+        print(f"Rebuilt leaderboard rollup for {rows} user(s)")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+"""
+Recompute the precomputed ``user_recommendations`` now instead of waiting
+for the agent's next scheduled run.
+
+    python -m app.utils.rebuild_recommendations
+"""
+import argparse
+import sys
+
+from app.services.recommendation_engine import rebuild_recommendations
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.parse_args(argv)
+
+    users = rebuild_recommendations()
+    print(f"Stored recommendations for {users} user(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
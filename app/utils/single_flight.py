@@ -0,0 +1,71 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+Progress = Callable[[Any], None]
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into one execution.
+
+    The work runs in its own task and every caller awaits it through
+    ``asyncio.shield``, so a caller that disconnects (including the one that
+    started the work) does not cancel it for the others.
+
+    ``fn`` is called with a ``report`` callback; every value reported goes to
+    the ``progress`` callback of each caller currently waiting on the key,
+    and a caller that joins late first gets the latest value.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._listeners: Dict[Hashable, List[Progress]] = {}
+        self._latest: Dict[Hashable, Any] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[Progress], Awaitable[Any]],
+        progress: Optional[Progress] = None,
+    ) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            self._listeners[key] = []
+            self._latest.pop(key, None)
+            task = asyncio.ensure_future(fn(lambda value: self._report(key, value)))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._finish(key, task))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        listeners = self._listeners.get(key)
+        if progress is not None and listeners is not None and not task.done():
+            listeners.append(progress)
+            if key in self._latest:
+                progress(self._latest[key])
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if progress is not None and listeners is not None and progress in listeners:
+                listeners.remove(progress)
+
+    def _report(self, key: Hashable, value: Any):
+        self._latest[key] = value
+        for listener in list(self._listeners.get(key, ())):
+            listener(value)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            self._listeners.pop(key, None)
+            self._latest.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._inflight),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
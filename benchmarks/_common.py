@@ -0,0 +1,82 @@
+"""
+Shared helpers for the benchmark scripts.
+
+The scripts run against a throwaway SQLite database so they can be executed
+without the production settings. Point ``BENCH_DATABASE_URL`` at a Postgres
+instance to get numbers that include real network round trips.
+"""
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.models.database import Base
+from app.models import user, quiz, quizAudit  # noqa: F401  (register tables)
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.statements = 0
+        self.commits = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine, "commit", self._on_commit)
+
+    def _on_execute(self, *args, **kwargs):
+        self.statements += 1
+
+    def _on_commit(self, *args, **kwargs):
+        self.commits += 1
+
+    def reset(self):
+        self.statements = 0
+        self.commits = 0
+
+
+def make_session_factory(name: str = "quiz_bench.db"):
+    url = os.environ.get("BENCH_DATABASE_URL")
+    if not url:
+        path = os.path.join(tempfile.gettempdir(), name)
+        if os.path.exists(path):
+            os.remove(path)
+        url = f"sqlite:///{path}"
+    engine = create_engine(url, future=True)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def sample_questions(num_questions: int):
+    return [
+        {
+            "question_text": f"Question {i}: what does this snippet print?",
+            "explanation": "Because of how the interpreter evaluates it.",
+            "options": [
+                {"option_text": f"{label}) answer {label}", "is_correct": label == "A"}
+                for label in "ABCD"
+            ],
+        }
+        for i in range(num_questions)
+    ]
+
+
+@contextmanager
+def timer(samples: list):
+    start = time.perf_counter()
+    yield
+    samples.append((time.perf_counter() - start) * 1000)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
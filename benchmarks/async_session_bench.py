@@ -0,0 +1,171 @@
+"""
+Event-loop throughput of the recommendations query under concurrency, with
+the sync ``Session`` called from ``async def`` (the old behaviour) and on
+``AsyncSession``. A ticker task measures how late the loop wakes it while
+the queries run.
+
+With SQLite every statement is a local call, so ``--latency-ms`` adds a
+simulated network round trip to each statement on the thread that executes
+it: the event loop thread for the sync session, the driver's thread for
+aiosqlite. Set ``DATABASE_URL`` to a Postgres database to measure real
+round trips instead.
+
+    python benchmarks/async_session_bench.py --concurrency 20 --latency-ms 2
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "async_session_bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_PATH}")
+
+from _common import percentile
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from app.models.database import Base, SessionLocal, async_engine, engine
+from app.models.quiz import Quiz, QuizTrend, UserActivity
+from app.services.ai_agent_service import AIAgentService
+from config import settings
+
+TECHNOLOGIES = ["Python", "Rust", "Go", "Java", "Docker", "AWS"]
+TICK_SECONDS = 0.005
+
+
+def install_latency(latency_ms: float):
+    def delay(statement):
+        time.sleep(latency_ms / 1000)
+
+    @event.listens_for(engine, "connect")
+    def on_sync_connect(dbapi_connection, connection_record):
+        dbapi_connection.set_trace_callback(delay)
+
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def on_async_connect(dbapi_connection, connection_record):
+        # Runs on aiosqlite's worker thread, like a network wait in asyncpg
+        connection_record.driver_connection._conn.set_trace_callback(delay)
+
+
+async def sync_session_recommendations(user_id: int):
+    """The recommendations query as it ran before: sync Session in async def."""
+    db = SessionLocal()
+    try:
+        tech_list = [
+            row[0]
+            for row in db.query(UserActivity.technology)
+            .filter(UserActivity.user_id == user_id)
+            .order_by(UserActivity.interaction_score.desc())
+            .limit(3)
+            .all()
+        ]
+        quizzes = (
+            db.query(Quiz)
+            .filter(Quiz.is_public == True, Quiz.technology.in_(tech_list))
+            .order_by(Quiz.created_at.desc())
+            .all()
+        )
+        random.shuffle(quizzes)
+        return [quiz.id for quiz in quizzes[:15]]
+    finally:
+        db.close()
+
+
+async def ticker(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append((time.perf_counter() - start - TICK_SECONDS) * 1000)
+
+
+async def scenario(label: str, call, args):
+    done = 0
+    deadline = time.perf_counter() + args.seconds
+
+    async def client(user_id: int):
+        nonlocal done
+        while time.perf_counter() < deadline:
+            await call(user_id)
+            done += 1
+
+    lags: list = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(
+        *[client(1 + i % args.users) for i in range(args.concurrency)]
+    )
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+
+    print(f"{label}")
+    print(f"  throughput   {done / elapsed:8.1f} requests/s ({done} in {elapsed:.1f}s)")
+    print(
+        f"  loop lag     p50={percentile(lags, 50):7.2f}ms "
+        f"p99={percentile(lags, 99):7.2f}ms max={max(lags):7.2f}ms "
+        f"({len(lags)} ticks)"
+    )
+
+
+def setup(args):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    for i in range(args.quizzes):
+        db.add(
+            Quiz(
+                title=f"Quiz {i}",
+                description="",
+                technology=TECHNOLOGIES[i % len(TECHNOLOGIES)],
+                difficulty="easy",
+                num_questions=10,
+                created_by=-1,
+                is_public=True,
+                is_ai_generated=True,
+            )
+        )
+    for user_id in range(1, args.users + 1):
+        for rank, technology in enumerate(random.sample(TECHNOLOGIES, 3)):
+            db.add(
+                UserActivity(
+                    user_id=user_id, technology=technology, interaction_score=3 - rank
+                )
+            )
+    for technology in TECHNOLOGIES:
+        db.add(QuizTrend(technology=technology, popularity_score=1.0))
+    db.commit()
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--quizzes", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=2)
+    args = parser.parse_args()
+
+    setup(args)
+    # New connections only: drop the ones setup left in the pool
+    engine.dispose()
+    if make_url(settings.DATABASE_URL).get_backend_name() == "sqlite":
+        install_latency(args.latency_ms)
+
+    agent = AIAgentService()
+    print(
+        f"{args.concurrency} concurrent clients, {args.quizzes} quizzes, "
+        f"pool size {settings.DB_POOL_SIZE}+{settings.DB_MAX_OVERFLOW}"
+    )
+    asyncio.run(
+        scenario("sync Session in async def (before)", sync_session_recommendations, args)
+    )
+    asyncio.run(scenario("AsyncSession (after)", agent.get_recommendations, args))
+
+
+if __name__ == "__main__":
+    main()
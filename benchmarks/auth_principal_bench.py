@@ -0,0 +1,81 @@
+"""
+Database statements per authenticated request for each kind of access
+token: a legacy token that only names the user, a fresh token whose claims
+are trusted, and a token older than PRINCIPAL_CLAIMS_TTL_SECONDS that goes
+through the principal cache.
+
+    python benchmarks/auth_principal_bench.py --requests 200
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "auth_principal_bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_PATH}")
+
+from _common import StatementCounter
+
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from main import app
+from app.models.database import Base, engine
+from app.utils.principals import principal_cache
+from config import settings
+
+
+def make_token(claims: dict, age_seconds: float = 0) -> str:
+    issued = datetime.utcnow() - timedelta(seconds=age_seconds)
+    payload = dict(claims, iat=issued, exp=issued + timedelta(days=1))
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def run(args):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    client = TestClient(app)
+    client.post(
+        "/api/v1/auth/register",
+        json={"username": "bench", "email": "bench@example.com", "password": "password1"},
+    )
+    legacy = make_token({"sub": "bench"})
+    user_id = client.get(
+        "/api/v1/auth/me", headers={"Authorization": f"Bearer {legacy}"}
+    ).json()["id"]
+
+    claims = {"sub": "bench", "uid": user_id, "active": True}
+    aged = settings.PRINCIPAL_CLAIMS_TTL_SECONDS + 60
+    tokens = {
+        "legacy (sub only)": legacy,
+        "fresh claims": make_token(claims),
+        "aged claims, cached": make_token(claims, age_seconds=aged),
+    }
+
+    counter = StatementCounter(engine)
+    print(f"{args.requests} requests per token kind to an auth-only endpoint")
+    for label, token in tokens.items():
+        principal_cache.invalidate(user_id)
+        headers = {"Authorization": f"Bearer {token}"}
+        counter.reset()
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            # 404 from the job store after authentication; no other queries
+            response = client.get("/api/v1/quiz/jobs/missing", headers=headers)
+            assert response.status_code == 404, response.text
+        elapsed = time.perf_counter() - start
+        print(
+            f"{label:22} {counter.statements / args.requests:5.2f} statements/request "
+            f"{elapsed / args.requests * 1000:7.2f} ms/request"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
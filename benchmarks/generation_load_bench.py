@@ -0,0 +1,77 @@
+"""
+Throughput and tail latency of GroqClient.generate_quiz against the fake
+Groq server, including the retry and batch-fallback paths.
+
+    python benchmarks/generation_load_bench.py --requests 50 --concurrency 10 \
+        --median-latency-ms 300 --wrong-count-rate 0.3 --rate-limit-rate 0.05
+"""
+import argparse
+import asyncio
+import time
+from dataclasses import fields
+
+from _common import percentile
+
+from app.utils.fake_groq import FakeGroq, FakeGroqConfig
+from app.utils.groq_client import GroqClient
+
+
+async def run(args, config):
+    fake = FakeGroq(config)
+    client = GroqClient(http_client=fake.http_client())
+    gate = asyncio.Semaphore(args.concurrency)
+    latencies, failures = [], 0
+
+    async def one():
+        nonlocal failures
+        async with gate:
+            start = time.perf_counter()
+            try:
+                quiz = await client.generate_quiz(
+                    args.technology, args.difficulty, args.num_questions
+                )
+                if not quiz:
+                    failures += 1
+            except Exception:
+                failures += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(args.requests)])
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{args.requests} quizzes x {args.num_questions} questions, "
+        f"concurrency {args.concurrency}"
+    )
+    print(f"throughput  {args.requests / elapsed:8.2f} quizzes/s")
+    print(
+        f"latency     p50={percentile(latencies, 50):.0f}ms "
+        f"p95={percentile(latencies, 95):.0f}ms p99={percentile(latencies, 99):.0f}ms"
+    )
+    print(f"failures    {failures}")
+    print(f"fake groq   {dict(fake.stats)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--num-questions", type=int, default=20)
+    parser.add_argument("--technology", default="Python")
+    parser.add_argument("--difficulty", default="medium")
+    for field in fields(FakeGroqConfig):
+        parser.add_argument(
+            "--" + field.name.replace("_", "-"),
+            type=int if field.name in ("seed", "stream_chunk_chars") else float,
+            default=field.default if field.name != "seed" else 42,
+        )
+    args = parser.parse_args()
+    config = FakeGroqConfig(
+        **{f.name: getattr(args, f.name) for f in fields(FakeGroqConfig)}
+    )
+    asyncio.run(run(args, config))
+
+
+if __name__ == "__main__":
+    main()
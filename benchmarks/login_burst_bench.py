@@ -0,0 +1,124 @@
+"""
+Latency of GET /api/v1/quiz/public while a burst of logins is hashing
+passwords, with bcrypt on the shared request threadpool (the old behaviour,
+``--workers 0``) and on the dedicated password-hashing pool.
+
+    python benchmarks/login_burst_bench.py --logins 200 --rounds 10
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "login_burst_bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_PATH}")
+
+from _common import percentile
+
+import httpx
+
+from main import app
+from app.models.database import Base, SessionLocal, engine
+from app.models.user import User
+from app.services import user_service as user_service_module
+from app.utils.password_hasher import PasswordHasher
+from app.utils.security import pwd_context
+
+PUBLIC = "/api/v1/quiz/public?limit=10&with_total=false"
+
+
+async def probe_public(client, stop: asyncio.Event, samples: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get(PUBLIC)
+        assert response.status_code == 200, response.text
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def scenario(label: str, hasher: PasswordHasher, args):
+    user_service_module.password_hasher = hasher
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        idle: list = []
+        stop = asyncio.Event()
+        probes = [asyncio.create_task(probe_public(client, stop, idle)) for _ in range(4)]
+        await asyncio.sleep(1)
+        stop.set()
+        await asyncio.gather(*probes)
+
+        busy: list = []
+        stop = asyncio.Event()
+        probes = [asyncio.create_task(probe_public(client, stop, busy)) for _ in range(4)]
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *[
+                client.post(
+                    "/api/v1/auth/token",
+                    data={"username": "bench", "password": "password1"},
+                )
+                for _ in range(args.logins)
+            ]
+        )
+        burst = time.perf_counter() - start
+        stop.set()
+        await asyncio.gather(*probes)
+
+    codes = {}
+    for response in responses:
+        codes[response.status_code] = codes.get(response.status_code, 0) + 1
+    print(f"{label}")
+    print(f"  login burst    {args.logins} logins in {burst:.2f}s, status {codes}")
+    for name, samples in (("/public idle", idle), ("/public burst", busy)):
+        print(
+            f"  {name:14} p50={percentile(samples, 50):7.1f}ms "
+            f"p95={percentile(samples, 95):7.1f}ms p99={percentile(samples, 99):7.1f}ms "
+            f"({len(samples)} requests)"
+        )
+
+
+def setup(rounds: int):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(
+        User(
+            username="bench",
+            email="bench@example.com",
+            hashed_password=pwd_context.hash("password1", rounds=rounds),
+        )
+    )
+    db.commit()
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--queue-limit", type=int, default=32)
+    args = parser.parse_args()
+
+    # Keep the stored hash at the benchmark's cost so no login rehashes
+    pwd_context.update(bcrypt__rounds=args.rounds)
+    setup(args.rounds)
+    asyncio.run(
+        scenario(
+            "shared request threadpool (workers=0)",
+            PasswordHasher(0, queue_limit=args.logins),
+            args,
+        )
+    )
+    asyncio.run(
+        scenario(
+            f"dedicated pool (workers={args.workers}, queue limit={args.queue_limit})",
+            PasswordHasher(args.workers, args.queue_limit),
+            args,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
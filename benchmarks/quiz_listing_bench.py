@@ -0,0 +1,71 @@
+"""
+Payload size and latency of one listing page: full QuizOut vs QuizSummaryOut.
+
+    python benchmarks/quiz_listing_bench.py [page_size] [num_questions] [iterations]
+"""
+import sys
+
+from _common import make_session_factory, percentile, sample_questions, timer
+
+from app.schemas.common import PaginatedResponse
+from app.schemas.quiz import QuizOut, QuizSummaryOut
+from app.services.quiz_service import QuizService
+from app.services.quiz_writer import QuizWriter
+
+
+def seed(session_factory, num_quizzes, num_questions):
+    writer = QuizWriter()
+    db = session_factory()
+    try:
+        for i in range(num_quizzes):
+            writer.write(
+                db,
+                title=f"Quiz {i}",
+                description="",
+                technology="Python",
+                difficulty="easy",
+                num_questions=num_questions,
+                created_by=1,
+                questions=sample_questions(num_questions),
+            )
+    finally:
+        db.close()
+
+
+def run(label, schema, summary, service, session_factory, page_size, iterations):
+    samples = []
+    body = b""
+    for _ in range(iterations):
+        db = session_factory()
+        try:
+            with timer(samples):
+                page = service.get_public_quizzes(
+                    db, limit=page_size, with_total=False, summary=summary
+                )
+                body = schema.model_validate(page).model_dump_json().encode()
+        finally:
+            db.close()
+    print(
+        f"{label:<8} bytes/page={len(body):>9} "
+        f"p50={percentile(samples, 50):8.2f}ms p95={percentile(samples, 95):8.2f}ms"
+    )
+
+
+def main():
+    page_size = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    num_questions = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    iterations = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    engine, session_factory = make_session_factory()
+    seed(session_factory, page_size, num_questions)
+    service = QuizService()
+
+    print(f"page of {page_size} quizzes x {num_questions} questions, {iterations} runs")
+    run("full", PaginatedResponse[QuizOut], False, service, session_factory,
+        page_size, iterations)
+    run("summary", PaginatedResponse[QuizSummaryOut], True, service, session_factory,
+        page_size, iterations)
+
+
+if __name__ == "__main__":
+    main()
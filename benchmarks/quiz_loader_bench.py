@@ -0,0 +1,102 @@
+"""
+Queries per response for quiz detail and listing, lazy vs eager loading.
+
+Fails with an AssertionError if the eager path ever issues more queries for
+a bigger quiz, i.e. if an N+1 sneaks back in.
+
+    python benchmarks/quiz_loader_bench.py
+"""
+from _common import StatementCounter, make_session_factory, sample_questions
+
+from app.models.quiz import Quiz
+from app.schemas.quiz import QuizOut
+from app.services.quiz_service import QuizService, quiz_counter
+from app.services.quiz_writer import QuizWriter
+
+PAGE_SIZE = 10
+
+
+def seed(session_factory, num_quizzes, num_questions):
+    writer = QuizWriter()
+    db = session_factory()
+    try:
+        return [
+            writer.write(
+                db,
+                title=f"Quiz {i}",
+                description="",
+                technology="Python",
+                difficulty="easy",
+                num_questions=num_questions,
+                created_by=1,
+                questions=sample_questions(num_questions),
+            )
+            for i in range(num_quizzes)
+        ]
+    finally:
+        db.close()
+
+
+def count(counter, session_factory, fn):
+    db = session_factory()
+    try:
+        counter.reset()
+        fn(db)
+        return counter.statements
+    finally:
+        db.close()
+
+
+def measure(num_questions, service):
+    engine, session_factory = make_session_factory()
+    counter = StatementCounter(engine)
+    quiz_ids = seed(session_factory, PAGE_SIZE, num_questions)
+
+    lazy_detail = count(
+        counter,
+        session_factory,
+        lambda db: QuizOut.model_validate(db.get(Quiz, quiz_ids[0])),
+    )
+    eager_detail = count(
+        counter,
+        session_factory,
+        lambda db: QuizOut.model_validate(service.get_quiz_by_id(db, quiz_ids[0])),
+    )
+    lazy_page = count(
+        counter,
+        session_factory,
+        lambda db: [
+            QuizOut.model_validate(q) for q in db.query(Quiz).limit(PAGE_SIZE).all()
+        ],
+    )
+    quiz_counter.invalidate(("public",))
+    eager_page = count(
+        counter,
+        session_factory,
+        lambda db: [
+            QuizOut.model_validate(q)
+            for q in service.get_public_quizzes(db, limit=PAGE_SIZE)["results"]
+        ],
+    )
+    engine.dispose()
+    return lazy_detail, eager_detail, lazy_page, eager_page
+
+
+def main():
+    service = QuizService()
+    results = {}
+    print(f"{'questions':>9} {'lazy detail':>12} {'eager detail':>13} "
+          f"{'lazy page':>10} {'eager page':>11}")
+    for num_questions in (5, 25, 50):
+        results[num_questions] = measure(num_questions, service)
+        print(f"{num_questions:>9} " + " ".join(
+            f"{n:>{w}}" for n, w in zip(results[num_questions], (12, 13, 10, 11))
+        ))
+
+    eager = {n: (r[1], r[3]) for n, r in results.items()}
+    assert len(set(eager.values())) == 1, f"eager query count varies: {eager}"
+    print("OK: eager query count is independent of the number of questions")
+
+
+if __name__ == "__main__":
+    main()
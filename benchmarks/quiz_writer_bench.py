@@ -0,0 +1,102 @@
+"""
+Round trips and latency per quiz: per-question commits vs QuizWriter.
+
+    python benchmarks/quiz_writer_bench.py [num_questions] [iterations]
+"""
+import sys
+
+from _common import (
+    StatementCounter,
+    make_session_factory,
+    percentile,
+    sample_questions,
+    timer,
+)
+
+from app.models.quiz import Quiz, Question, Option
+from app.services.quiz_writer import QuizWriter
+
+
+def legacy_write(db, questions):
+    # The pre-QuizWriter code path: one commit + refresh per question.
+    quiz = Quiz(
+        title="Bench Quiz",
+        description="",
+        technology="Python",
+        difficulty="easy",
+        num_questions=len(questions),
+        created_by=1,
+        is_public=True,
+    )
+    db.add(quiz)
+    db.commit()
+    db.refresh(quiz)
+
+    for q in questions:
+        question = Question(
+            quiz_id=quiz.id,
+            question_text=q["question_text"],
+            explanation=q["explanation"],
+        )
+        db.add(question)
+        db.commit()
+        db.refresh(question)
+
+        for o in q["options"]:
+            db.add(
+                Option(
+                    question_id=question.id,
+                    option_text=o["option_text"],
+                    is_correct=o["is_correct"],
+                )
+            )
+
+    db.commit()
+    return quiz
+
+
+def writer_write(db, questions, writer=QuizWriter()):
+    return writer.write(
+        db,
+        title="Bench Quiz",
+        description="",
+        technology="Python",
+        difficulty="easy",
+        num_questions=len(questions),
+        created_by=1,
+        questions=questions,
+    )
+
+
+def run(label, fn, session_factory, counter, questions, iterations):
+    samples = []
+    counter.reset()
+    for _ in range(iterations):
+        db = session_factory()
+        try:
+            with timer(samples):
+                fn(db, questions)
+        finally:
+            db.close()
+    print(
+        f"{label:<14} statements/quiz={counter.statements / iterations:6.1f} "
+        f"commits/quiz={counter.commits / iterations:5.1f} "
+        f"p50={percentile(samples, 50):7.2f}ms p95={percentile(samples, 95):7.2f}ms"
+    )
+
+
+def main():
+    num_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 25
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    questions = sample_questions(num_questions)
+
+    engine, session_factory = make_session_factory()
+    counter = StatementCounter(engine)
+
+    print(f"{num_questions} questions x 4 options, {iterations} quizzes")
+    run("per-question", legacy_write, session_factory, counter, questions, iterations)
+    run("QuizWriter", writer_write, session_factory, counter, questions, iterations)
+
+
+if __name__ == "__main__":
+    main()
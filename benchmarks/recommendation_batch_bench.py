@@ -0,0 +1,122 @@
+"""
+Time of one recommendation batch run as the number of users grows, and
+latency of recommendation lookups for a user with precomputed
+recommendations versus one served by the live fallback.
+
+    python benchmarks/recommendation_batch_bench.py --users 1000 10000
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "recommendation_batch_bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_PATH}")
+
+from _common import percentile
+
+from sqlalchemy import delete, func, insert, select
+
+from app.models.database import Base, SessionLocal, engine
+from app.models.quiz import Quiz, UserActivity, UserRecommendation
+from app.services.ai_agent_service import AIAgentService
+from app.services.recommendation_engine import recommendation_engine
+
+TECHNOLOGIES = [f"Technology {i}" for i in range(40)]
+ACTIVITIES_PER_USER = 6
+
+
+def setup(quizzes: int):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Quiz),
+            [
+                {
+                    "title": f"Quiz {i}",
+                    "technology": TECHNOLOGIES[i % len(TECHNOLOGIES)],
+                    "difficulty": "easy",
+                    "num_questions": 10,
+                    "created_by": -1,
+                    "is_public": True,
+                }
+                for i in range(quizzes)
+            ],
+        )
+
+
+def grow_users(users: int):
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        existing = conn.scalar(select(func.max(UserActivity.user_id))) or 0
+        rows = []
+        for user_id in range(existing + 1, users + 1):
+            # Users cluster around a few neighbouring technologies
+            centre = random.randrange(len(TECHNOLOGIES))
+            for _ in range(ACTIVITIES_PER_USER):
+                technology = TECHNOLOGIES[
+                    (centre + random.randint(-2, 2)) % len(TECHNOLOGIES)
+                ]
+                rows.append(
+                    {
+                        "user_id": user_id,
+                        "technology": technology,
+                        "interaction_score": float(random.randint(1, 20)),
+                        "last_interaction": now - timedelta(days=random.randint(0, 90)),
+                    }
+                )
+        if rows:
+            conn.execute(insert(UserActivity), rows)
+
+
+async def lookups(agent: AIAgentService, user_id: int, calls: int):
+    times = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        result = await agent.get_recommendations(user_id)
+        times.append((time.perf_counter() - start) * 1000)
+    assert result, "no recommendations"
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--quizzes", type=int, default=5000)
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+
+    setup(args.quizzes)
+    agent = AIAgentService()
+    print(f"{len(TECHNOLOGIES)} technologies, {args.quizzes} quizzes")
+    for users in sorted(args.users):
+        grow_users(users)
+        db = SessionLocal()
+        try:
+            recommendation_engine.build(db)
+        finally:
+            db.close()
+        build = recommendation_engine.last_build
+        print(
+            f"{users:7d} users  batch {build['duration_ms']:8.1f}ms "
+            f"({build['stored']} stored)"
+        )
+
+    # Drop one user's entry so the same user is measured on both paths
+    precomputed = asyncio.run(lookups(agent, 1, args.calls))
+    with engine.begin() as conn:
+        conn.execute(delete(UserRecommendation).where(UserRecommendation.user_id == 1))
+    live = asyncio.run(lookups(agent, 1, args.calls))
+    for label, times in (("precomputed lookup", precomputed), ("live fallback", live)):
+        print(
+            f"{label:19} p50={percentile(times, 50):6.2f}ms "
+            f"p95={percentile(times, 95):6.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Latency and Python memory of one recommendations call as the catalog grows,
+for the old approach (load every public quiz of the user's technologies,
+shuffle, keep 15) and ``AIAgentService.get_recommendations``.
+
+    python benchmarks/recommendations_bench.py --sizes 1000 10000 50000
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "recommendations_bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_PATH}")
+
+from _common import percentile
+
+from sqlalchemy import insert, select
+
+from app.models.database import AsyncSessionLocal, Base, engine
+from app.models.quiz import Quiz, QuizAttempt, UserActivity
+from app.services.ai_agent_service import AIAgentService
+
+TECHNOLOGIES = [f"Technology {i}" for i in range(20)]
+USER_ID = 1
+
+
+async def load_all_recommendations(user_id: int):
+    """The recommendations query as it ran before."""
+    async with AsyncSessionLocal() as db:
+        tech_list = list(
+            await db.scalars(
+                select(UserActivity.technology)
+                .where(UserActivity.user_id == user_id)
+                .order_by(UserActivity.interaction_score.desc())
+                .limit(3)
+            )
+        )
+        quizzes = (
+            await db.scalars(
+                select(Quiz)
+                .where(Quiz.is_public == True, Quiz.technology.in_(tech_list))
+                .order_by(Quiz.created_at.desc())
+            )
+        ).all()
+        random.shuffle(quizzes)
+        return [quiz.id for quiz in quizzes[:15]]
+
+
+def grow_catalog(size: int):
+    with engine.begin() as conn:
+        existing = conn.scalar(select(Quiz.id).order_by(Quiz.id.desc()).limit(1)) or 0
+        if existing >= size:
+            return
+        conn.execute(
+            insert(Quiz),
+            [
+                {
+                    "title": f"Quiz {i}",
+                    "description": "A generated quiz " * 20,
+                    "technology": TECHNOLOGIES[i % len(TECHNOLOGIES)],
+                    "difficulty": "easy",
+                    "num_questions": 10,
+                    "created_by": -1,
+                    "is_public": True,
+                    "is_ai_generated": True,
+                }
+                for i in range(existing, size)
+            ],
+        )
+
+
+async def measure(call, calls: int):
+    times = []
+    tracemalloc.start()
+    for _ in range(calls):
+        start = time.perf_counter()
+        await call(USER_ID)
+        times.append((time.perf_counter() - start) * 1000)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return times, peak
+
+
+def setup():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(UserActivity),
+            [
+                {"user_id": USER_ID, "technology": technology, "interaction_score": 3 - i}
+                for i, technology in enumerate(TECHNOLOGIES[:3])
+            ],
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--calls", type=int, default=30)
+    args = parser.parse_args()
+
+    setup()
+    agent = AIAgentService()
+    print(f"{'quizzes':>8} {'approach':12} {'p50':>9} {'p95':>9} {'peak memory':>12}")
+    sizes = sorted(args.sizes)
+    grow_catalog(sizes[0])
+    # A few attempts, so the exclusion has something to exclude
+    with engine.begin() as conn:
+        conn.execute(
+            insert(QuizAttempt),
+            [{"user_id": USER_ID, "quiz_id": quiz_id, "score": 5} for quiz_id in (1, 21)],
+        )
+    for size in sizes:
+        grow_catalog(size)
+        for label, call in (
+            ("load all", load_all_recommendations),
+            ("sampled", agent.get_recommendations),
+        ):
+            times, peak = asyncio.run(measure(call, args.calls))
+            print(
+                f"{size:8d} {label:12} {percentile(times, 50):7.2f}ms "
+                f"{percentile(times, 95):7.2f}ms {peak / 1024:9.0f} KiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
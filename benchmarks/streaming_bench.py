@@ -0,0 +1,63 @@
+"""
+Time to first question of GroqClient.stream_quiz against the time to the
+whole quiz from GroqClient.generate_quiz.
+
+Needs the fake Groq server running over HTTP, since the in-process ASGI
+transport buffers whole responses:
+
+    python -m app.utils.fake_groq --port 8787 --median-latency-ms 8000
+    python benchmarks/streaming_bench.py --base-url http://127.0.0.1:8787
+"""
+import argparse
+import asyncio
+import time
+
+from _common import percentile
+
+import httpx
+
+from app.utils.groq_client import GroqClient
+
+
+async def run(args):
+    client = GroqClient(http_client=httpx.AsyncClient(timeout=httpx.Timeout(60.0)))
+    client.client = client.client.with_options(base_url=args.base_url)
+    full, first, last = [], [], []
+
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        await client.generate_quiz(args.technology, args.difficulty, args.num_questions)
+        full.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        async for _question in client.stream_quiz(
+            args.technology, args.difficulty, args.num_questions
+        ):
+            if len(first) < len(full):
+                first.append((time.perf_counter() - start) * 1000)
+        last.append((time.perf_counter() - start) * 1000)
+
+    print(f"{args.requests} quizzes x {args.num_questions} questions")
+    for label, samples in (
+        ("generate_quiz, whole quiz", full),
+        ("stream_quiz, first question", first),
+        ("stream_quiz, last question", last),
+    ):
+        print(
+            f"{label:28} p50={percentile(samples, 50):6.0f}ms "
+            f"p95={percentile(samples, 95):6.0f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8787")
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--num-questions", type=int, default=20)
+    parser.add_argument("--technology", default="Python")
+    parser.add_argument("--difficulty", default="medium")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
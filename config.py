@@ -1,4 +1,4 @@
-from typing import ClassVar, List
+from typing import ClassVar, List, Literal, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -8,8 +8,84 @@ class Settings(BaseSettings):
     PORT: int = 8080
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440
+    # Connections kept open per worker process, plus how many more may be
+    # opened under load and how long a request waits for one before failing
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    # Replace connections older than this (seconds; -1 never) and test each
+    # one before use, so idle connections dropped by the server are not used
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Async endpoints and the AI agent use an asyncio driver; by default the
+    # DATABASE_URL with asyncpg (Postgres) or aiosqlite (SQLite) swapped in
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Token claims (user id, flags) younger than this are trusted without a
+    # database lookup. Revocation is per process: a deactivated user's tokens
+    # are refused at once by the worker that deactivated them, but other
+    # workers keep accepting them for up to this many seconds.
+    PRINCIPAL_CLAIMS_TTL_SECONDS: int = 300
+    PRINCIPAL_CACHE_SIZE: int = 1024
+    # bcrypt cost for new password hashes; existing ones are rehashed on login
+    BCRYPT_ROUNDS: int = 12
+    # Password hashing runs on its own threads; requests beyond the queue
+    # limit get a 503 instead of waiting. 0 workers hashes on the shared
+    # request threadpool.
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_LIMIT: int = 32
+    # Event-loop lag watchdog: samples scheduling lag every interval and
+    # logs the loop's stack when it is blocked for longer than the threshold
+    LOOP_WATCHDOG_ENABLED: bool = True
+    LOOP_WATCHDOG_INTERVAL_MS: int = 100
+    LOOP_WATCHDOG_THRESHOLD_MS: int = 250
     GROQ_API_KEY: str
     # GROQ_API_KEY_V2: str
+    # Point at app.utils.fake_groq for load tests without a live key
+    GROQ_BASE_URL: Optional[str] = None
+    GROQ_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    GROQ_READ_TIMEOUT_SECONDS: float = 60.0
+    GROQ_CALL_TIMEOUT_SECONDS: float = 90.0
+    GROQ_MAX_CONNECTIONS: int = 10
+    # off | readwrite | replay (never calls Groq, fails on a cache miss)
+    LLM_CACHE_MODE: str = "off"
+    LLM_CACHE_PATH: str = "llm_cache.sqlite3"
+    LLM_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    QUIZ_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    QUIZ_COUNT_CACHE_SECONDS: int = 60
+    LEADERBOARD_REFRESH_SECONDS: int = 30
+    INVENTORY_ENABLED: bool = True
+    INVENTORY_TARGET_DEPTH: int = 2
+    INVENTORY_QUESTIONS: int = 25
+    INVENTORY_REFILL_INTERVAL_SECONDS: int = 60
+    SCHEDULER_WORKERS: int = 3
+    SCHEDULER_PLAN_INTERVAL_SECONDS: int = 300
+    SCHEDULER_JOBS_PER_PLAN: int = 6
+    # Buckets scoring below this demand / (1 + supply) are left alone, so the
+    # scheduler goes idle once supply meets demand: at the baseline demand
+    # of 1, a bucket is topped up only while it holds fewer than 5 quizzes
+    SCHEDULER_MIN_PRIORITY: float = 0.2
+    # Groq quota reserved for background generation (requests per minute)
+    GROQ_BACKGROUND_REQUESTS_PER_MINUTE: int = 20
+    GROQ_BACKGROUND_BURST: int = 5
+    # How identical concurrent /quiz/generate calls are coalesced:
+    #   copy   one Groq call, each caller gets a quiz of their own
+    #   shared one Groq call and one stored quiz, owned by the first caller;
+    #          the others get that quiz back but it is not in their /quiz/user
+    #   off    every call goes to Groq
+    GENERATION_SINGLE_FLIGHT_MODE: Literal["copy", "shared", "off"] = "copy"
+    # How long finished /quiz/jobs results stay available for polling
+    GENERATION_JOB_TTL_SECONDS: int = 3600
+    # Batch job precomputing /ai/recommendations; users without a precomputed
+    # entry (new since the last run) get the live recommendations. When off,
+    # entries left from earlier runs are ignored. On PostgreSQL one worker
+    # rebuilds at a time; the others skip the run.
+    RECOMMENDATIONS_PRECOMPUTE_ENABLED: bool = True
+    RECOMMENDATION_REFRESH_SECONDS: int = 900
+    # Activity loses half its weight every this many days without interaction
+    RECOMMENDATION_HALF_LIFE_DAYS: float = 14.0
+    # Estimated Jaccard similarity at which a generated question counts as a
+    # near-duplicate of a stored question of the same technology
+    DUPLICATE_QUESTION_THRESHOLD: float = 0.7
 
     TOP_TECHNOLOGIES: ClassVar[List[str]] = [
         "Artificial Intelligence",
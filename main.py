@@ -4,23 +4,35 @@ import asyncio
 
 import uvicorn
 from app.services.ai_agent_service import AIAgentService
-from app.models.database import Base, engine
+from app.models.database import Base, async_engine, engine
 from app.controllers import auth_controller, quiz_controller, ai_agent_controller
 from fastapi.middleware.cors import CORSMiddleware
 from app.utils.migrate import run_migrations
+from app.utils.groq_client import close_http_client
+from app.utils.loop_watchdog import loop_watchdog
+from app.utils.question_index import load_question_index
 from config import settings
 
 # run_migrations(apply_only=True)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    if settings.LOOP_WATCHDOG_ENABLED:
+        loop_watchdog.start()
     print("Starting AI Agent...")
     agent = AIAgentService()
     app.state.quiz_agent = agent
     asyncio.create_task(agent.run_scheduled_generation())
+    asyncio.create_task(agent.run_inventory_refill())
+    asyncio.create_task(agent.run_recommendation_refresh())
+    asyncio.create_task(asyncio.to_thread(load_question_index))
     yield
     print("Stopping AI Agent...")
     await agent.stop()
+    await quiz_controller.generation_jobs.stop()
+    await close_http_client()
+    await async_engine.dispose()
+    await loop_watchdog.stop()
 
 app = FastAPI(
     title="AI Agent Quiz Platform",
@@ -0,0 +1,42 @@
+import os
+import tempfile
+
+# Settings are read at import time, so the test database is set up first
+DB_PATH = os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ.setdefault("LLM_CACHE_MODE", "off")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import pytest
+
+import app.models.quiz  # noqa: F401  (registers the tables)
+import app.models.user  # noqa: F401
+from app.models.database import Base, engine
+
+
+@pytest.fixture(autouse=True)
+def database():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+    engine.dispose()
+
+
+def quiz_data(num_questions: int = 2) -> dict:
+    """A generated quiz in the shape GroqClient.generate_quiz returns."""
+    return {
+        "title": "Generated quiz",
+        "description": "A generated quiz",
+        "questions": [
+            {
+                "question_text": f"Question {i}?",
+                "options": [
+                    {"option_text": "A) yes", "is_correct": True},
+                    {"option_text": "B) no", "is_correct": False},
+                ],
+            }
+            for i in range(num_questions)
+        ],
+    }
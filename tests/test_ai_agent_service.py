@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+from sqlalchemy import insert
+
+from app.models.database import async_engine, engine
+from app.models.quiz import Quiz, QuizAttempt, UserRecommendation
+from app.services.ai_agent_service import AIAgentService
+from app.services.recommendation_engine import rebuild_recommendations
+from tests.conftest import quiz_data
+
+
+def test_refill_holds_no_connection_during_generation(monkeypatch):
+    agent = AIAgentService()
+    checked_out = []
+
+    async def generate_quiz(technology, difficulty, num_questions, progress=None):
+        checked_out.append(async_engine.sync_engine.pool.checkedout())
+        return quiz_data(num_questions)
+
+    monkeypatch.setattr(agent.groq_client, "generate_quiz", generate_quiz)
+
+    async def run():
+        try:
+            return await agent.refill_inventory()
+        finally:
+            await async_engine.dispose()
+
+    assert asyncio.run(run()) is True
+    assert checked_out == [0]
+
+
+def _public_quizzes(technology: str, count: int):
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Quiz),
+            [
+                {
+                    "title": f"{technology} {i}",
+                    "technology": technology,
+                    "difficulty": "easy",
+                    "num_questions": 1,
+                    "created_by": -1,
+                    "is_public": True,
+                }
+                for i in range(count)
+            ],
+        )
+
+
+def test_attempts_feed_the_precomputed_recommendations():
+    agent = AIAgentService()
+    _public_quizzes("Python", 3)
+    with engine.begin() as conn:
+        conn.execute(insert(QuizAttempt), [{"user_id": 1, "quiz_id": 1, "score": 1}])
+
+    async def run():
+        try:
+            await agent.analyze_user_behavior(1, 1)
+        finally:
+            await async_engine.dispose()
+
+    asyncio.run(run())
+    assert rebuild_recommendations() == 1
+
+
+def test_precomputed_recommendations_skip_later_attempts():
+    agent = AIAgentService()
+    _public_quizzes("Python", 3)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(UserRecommendation),
+            [
+                {
+                    "user_id": 1,
+                    "payload": json.dumps(
+                        [[quiz_id, "Quiz", "Python", "easy"] for quiz_id in (1, 2, 3)]
+                    ),
+                }
+            ],
+        )
+        # Attempted after the last rebuild
+        conn.execute(insert(QuizAttempt), [{"user_id": 1, "quiz_id": 2, "score": 1}])
+
+    async def run():
+        try:
+            return await agent.get_recommendations(1)
+        finally:
+            await async_engine.dispose()
+
+    assert sorted(quiz["id"] for quiz in asyncio.run(run())) == [1, 3]
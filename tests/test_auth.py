@@ -0,0 +1,35 @@
+from fastapi.testclient import TestClient
+
+import main
+from app.models.database import SessionLocal
+from app.models.user import User
+from app.utils.principals import principal_cache
+
+
+def test_deactivated_account_is_refused_at_once():
+    client = TestClient(main.app)
+    client.post(
+        "/api/v1/auth/register",
+        json={"username": "carol", "email": "c@example.com", "password": "password1"},
+    )
+    token = client.post(
+        "/api/v1/auth/token", data={"username": "carol", "password": "password1"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+
+    response = client.post("/api/v1/auth/deactivate", headers=headers)
+    assert response.status_code == 200
+    user_id = response.json()["id"]
+    try:
+        assert response.json()["is_active"] is False
+        # The token's claims are fresh, but this worker revoked them
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+        db = SessionLocal()
+        try:
+            assert db.query(User.is_active).filter(User.id == user_id).scalar() is False
+        finally:
+            db.close()
+    finally:
+        # User ids are reused by the next test's database
+        principal_cache.invalidate(user_id)
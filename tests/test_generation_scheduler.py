@@ -0,0 +1,95 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+import main
+from app.models.database import SessionLocal, async_engine, engine
+from app.models.quiz import Quiz
+from app.services.generation_scheduler import GenerationScheduler
+from app.services.inventory_service import DIFFICULTIES
+from config import settings
+
+
+async def _generate(technology, difficulty):
+    return None
+
+
+def _planned(scheduler: GenerationScheduler):
+    db = SessionLocal()
+    try:
+        scheduler.plan(db)
+    finally:
+        db.close()
+    job = scheduler.queue.get_nowait()
+    return job.technology
+
+
+def test_user_activity_changes_the_planned_technology(monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULER_JOBS_PER_PLAN", 1)
+    # Same supply in every bucket, so without activity priorities tie
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Quiz),
+            [
+                {
+                    "title": f"{technology} {difficulty}",
+                    "technology": technology,
+                    "difficulty": difficulty,
+                    "num_questions": 1,
+                    "created_by": -1,
+                    "is_public": True,
+                }
+                for technology in settings.TOP_TECHNOLOGIES
+                for difficulty in DIFFICULTIES
+            ],
+        )
+    untouched = _planned(GenerationScheduler(_generate))
+    target = next(t for t in settings.TOP_TECHNOLOGIES if t != untouched)
+
+    client = TestClient(main.app)
+    client.post(
+        "/api/v1/auth/register",
+        json={"username": "alice", "email": "a@example.com", "password": "password1"},
+    )
+    token = client.post(
+        "/api/v1/auth/token", data={"username": "alice", "password": "password1"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    quiz = client.post(
+        "/api/v1/quiz/create",
+        json={
+            "title": "Practice",
+            "technology": target,
+            "difficulty": "medium",
+            "num_questions": 1,
+            "questions": [
+                {
+                    "question_text": "Question?",
+                    "options": [
+                        {"option_text": "A) yes", "is_correct": True},
+                        {"option_text": "B) no", "is_correct": False},
+                    ],
+                }
+            ],
+        },
+        headers=headers,
+    ).json()
+    question = quiz["questions"][0]
+    response = client.post(
+        "/api/v1/quiz/submit",
+        json={
+            "quiz_id": quiz["id"],
+            "answers": [
+                {
+                    "question_id": question["id"],
+                    "selected_option_id": question["options"][0]["id"],
+                }
+            ],
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    asyncio.run(async_engine.dispose())
+
+    assert _planned(GenerationScheduler(_generate)) == target
@@ -0,0 +1,28 @@
+import asyncio
+
+from app.utils.fake_groq import FakeGroq, FakeGroqConfig
+from app.utils.groq_client import GroqClient
+
+
+def test_stalled_stream_consumers_do_not_block_generation():
+    fake = FakeGroq(FakeGroqConfig(median_latency_ms=50, latency_sigma=0, seed=1))
+    client = GroqClient(http_client=fake.http_client())
+
+    async def run():
+        # As many stalled streams as the client has Groq slots
+        stalled = [
+            client.stream_quiz(f"Technology {i}", "easy", 5) for i in range(3)
+        ]
+        try:
+            for stream in stalled:
+                await stream.__anext__()
+            assert not client.semaphore.locked()
+            return await asyncio.wait_for(
+                client.generate_quiz("Python", "easy", 3), timeout=10
+            )
+        finally:
+            for stream in stalled:
+                await stream.aclose()
+
+    quiz = asyncio.run(run())
+    assert len(quiz["questions"]) == 3
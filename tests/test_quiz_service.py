@@ -0,0 +1,34 @@
+import asyncio
+
+from app.models.database import AsyncSessionLocal, async_engine
+from app.services.quiz_service import QuizService
+from config import settings
+from tests.conftest import quiz_data
+
+
+def test_inventory_miss_holds_no_connection_during_generation(monkeypatch):
+    service = QuizService()
+    checked_out = []
+
+    async def generate_quiz(technology, difficulty, num_questions, progress=None):
+        checked_out.append(async_engine.sync_engine.pool.checkedout())
+        await asyncio.sleep(0.05)
+        checked_out.append(async_engine.sync_engine.pool.checkedout())
+        return quiz_data(num_questions)
+
+    monkeypatch.setattr(service.groq_client, "generate_quiz", generate_quiz)
+    monkeypatch.setattr(settings, "INVENTORY_ENABLED", True)
+
+    async def run():
+        try:
+            async with AsyncSessionLocal() as db:
+                # A stocked technology whose bucket is empty: a miss
+                return await service.generate_quiz_with_groq(
+                    db, settings.TOP_TECHNOLOGIES[0], "easy", 2, user_id=1
+                )
+        finally:
+            await async_engine.dispose()
+
+    quiz = asyncio.run(run())
+    assert quiz is not None and len(quiz.questions) == 2
+    assert checked_out == [0, 0]